@@ -41,6 +41,9 @@ class MSBoard(object):
         else:
             self.num_mines = num_mines
 
+        # set to a dict to record the fields that moves change, see
+        # set_field and discover_region.
+        self.changed_fields = None
         self.init_board()
 
     def init_board(self):
@@ -51,6 +54,9 @@ class MSBoard(object):
         mine_map : numpy.ndarray
             the map that defines the mine
             0 is empty, 1 is mine
+        count_map : numpy.ndarray
+            the number of mines in the 3x3 region around each field,
+            i.e. the number shown when a safe field is discovered.
         info_map : numpy.ndarray
             the map that presents to gamer
             0-8 is number of mines in srrounding.
@@ -58,20 +64,75 @@ class MSBoard(object):
             10 is questioned field.
             11 is undiscovered field.
             12 is a mine field.
+        num_revealed, num_flagged, num_questioned, num_undiscovered,
+        num_exploded : int
+            how many fields of each kind the info map has, kept up to
+            date by every move so check_board doesn't scan the board.
+        num_correct_flags : int
+            how many flagged fields are mines.
         """
-        self.mine_map = np.zeros((self.board_height, self.board_width),
-                                 dtype=np.uint8)
+        if getattr(self, "mine_map", None) is None:
+            self.mine_map = np.zeros((self.board_height, self.board_width),
+                                     dtype=np.uint8)
+            self.count_map = np.zeros_like(self.mine_map)
+            self.info_map = np.zeros_like(self.mine_map)
+            self.padded_map = np.zeros((self.board_height+2,
+                                        self.board_width+2), dtype=np.uint8)
+        else:
+            # a board that is reset keeps its buffers.
+            self.mine_map.fill(0)
+            self.count_map.fill(0)
+
         idx_list = np.random.permutation(self.board_width*self.board_height)
         idx_list = idx_list[:self.num_mines]
+        self.mine_map.flat[idx_list] = 1
+
+        # sum the 9 shifted copies of the padded mine map once,
+        # so revealing a field is a lookup instead of a 3x3 sum.
+        self.padded_map[1:-1, 1:-1] = self.mine_map
+        for shift_y in range(3):
+            for shift_x in range(3):
+                self.count_map += \
+                    self.padded_map[shift_y:shift_y+self.board_height,
+                                    shift_x:shift_x+self.board_width]
+
+        self.info_map.fill(11)
+        self.num_revealed = 0
+        self.num_flagged = 0
+        self.num_correct_flags = 0
+        self.num_questioned = 0
+        self.num_undiscovered = self.board_width*self.board_height
+        self.num_exploded = 0
+
+    def count_field(self, move_x, move_y, step):
+        """Add step to the counter of the field's current status."""
+        field_status = self.info_map[move_y, move_x]
 
-        for idx in idx_list:
-            idx_x = int(idx % self.board_width)
-            idx_y = int(idx / self.board_width)
-
-            self.mine_map[idx_y, idx_x] = 1
-
-        self.info_map = np.ones((self.board_height, self.board_width),
-                                dtype=np.uint8)*11
+        if field_status <= 8:
+            self.num_revealed += step
+        elif field_status == 9:
+            self.num_flagged += step
+            if self.mine_map[move_y, move_x] == 1:
+                self.num_correct_flags += step
+        elif field_status == 10:
+            self.num_questioned += step
+        elif field_status == 11:
+            self.num_undiscovered += step
+        elif field_status == 12:
+            self.num_exploded += step
+
+    def set_field(self, move_x, move_y, field_status):
+        """Set the status of a field, keeping the counters up to date.
+
+        If changed_fields is a dict, the field is recorded in it as
+        (X, Y) -> its status before the first change.
+        """
+        if self.changed_fields is not None:
+            self.changed_fields.setdefault((move_x, move_y),
+                                           self.info_map[move_y, move_x])
+        self.count_field(move_x, move_y, -1)
+        self.info_map[move_y, move_x] = field_status
+        self.count_field(move_x, move_y, 1)
 
     def click_field(self, move_x, move_y):
         """Click one grid by given position."""
@@ -80,41 +141,55 @@ class MSBoard(object):
         # can only click blank region
         if field_status == 11:
             if self.mine_map[move_y, move_x] == 1:
-                self.info_map[move_y, move_x] = 12
+                self.set_field(move_x, move_y, 12)
             else:
                 # discover the region.
                 self.discover_region(move_x, move_y)
 
     def discover_region(self, move_x, move_y):
-        """Discover region from given location."""
+        """Discover region from given location.
+
+        A field is uncovered as soon as it is queued, so the info map itself
+        marks the visited fields and each field is handled only once.
+        Every uncovered field was undiscovered, so the counters are
+        settled in one go at the end, and the fields are recorded in
+        changed_fields (if it's set) as having been undiscovered.
+        """
+        self.info_map[move_y, move_x] = self.count_map[move_y, move_x]
         field_list = deque([(move_y, move_x)])
+        num_discovered = 1
+        discovered = [] if self.changed_fields is not None else None
 
         while len(field_list) != 0:
             field = field_list.popleft()
-
-            (tl_idx, br_idx, region_sum) = self.get_region(field[1], field[0])
-            if region_sum == 0:
-                self.info_map[field[0], field[1]] = region_sum
-                # get surrounding to queue
-                region_mat = self.info_map[tl_idx[0]:br_idx[0]+1,
-                                           tl_idx[1]:br_idx[1]+1]
-                x_list, y_list = np.nonzero(region_mat == 11)
-
-                for x_idx, y_idx in zip(x_list, y_list):
-                    field_temp = (x_idx+max(field[0]-1, 0),
-                                  y_idx+max(field[1]-1, 0))
-                    if field_temp not in field_list:
-                        field_list.append(field_temp)
-            elif region_sum > 0:
-                self.info_map[field[0], field[1]] = region_sum
+            if self.count_map[field] != 0:
+                continue
+
+            # get surrounding to queue
+            (tl_idx, br_idx, _) = self.get_region(field[1], field[0])
+            for y_idx in range(tl_idx[0], br_idx[0]+1):
+                for x_idx in range(tl_idx[1], br_idx[1]+1):
+                    if self.info_map[y_idx, x_idx] == 11:
+                        self.info_map[y_idx, x_idx] = \
+                            self.count_map[y_idx, x_idx]
+                        field_list.append((y_idx, x_idx))
+                        num_discovered += 1
+                        if discovered is not None:
+                            discovered.append((x_idx, y_idx))
+
+        self.num_undiscovered -= num_discovered
+        self.num_revealed += num_discovered
+        if discovered is not None:
+            self.changed_fields.setdefault((move_x, move_y), 11)
+            for field in discovered:
+                self.changed_fields.setdefault(field, 11)
 
     def get_region(self, move_x, move_y):
         """Get region around a location."""
         top_left = (max(move_y-1, 0), max(move_x-1, 0))
         bottom_right = (min(move_y+1, self.board_height-1),
                         min(move_x+1, self.board_width-1))
-        region_sum = self.mine_map[top_left[0]:bottom_right[0]+1,
-                                   top_left[1]:bottom_right[1]+1].sum()
+        region_sum = self.count_map[move_y, move_x]
 
         return top_left, bottom_right, region_sum
 
@@ -124,14 +199,14 @@ class MSBoard(object):
 
         # a questioned or undiscovered field
         if field_status != 9 and (field_status == 10 or field_status == 11):
-            self.info_map[move_y, move_x] = 9
+            self.set_field(move_x, move_y, 9)
 
     def unflag_field(self, move_x, move_y):
         """Unflag or unquestion a grid by given position."""
         field_status = self.info_map[move_y, move_x]
 
         if field_status == 9 or field_status == 10:
-            self.info_map[move_y, move_x] = 11
+            self.set_field(move_x, move_y, 11)
 
     def question_field(self, move_x, move_y):
         """Question a grid by given position."""
@@ -139,19 +214,20 @@ class MSBoard(object):
 
         # a questioned or undiscovered field
         if field_status != 10 and (field_status == 9 or field_status == 11):
-            self.info_map[move_y, move_x] = 10
+            self.set_field(move_x, move_y, 10)
 
     def check_board(self):
-        """Check the board status and give feedback."""
-        num_mines = np.sum(self.info_map == 12)
-        num_undiscovered = np.sum(self.info_map == 11)
-        num_questioned = np.sum(self.info_map == 10)
+        """Check the board status and give feedback.
 
-        if num_mines > 0:
+        Only reads the counters, so it assumes the info map is changed
+        through the field methods above.
+        """
+        if self.num_exploded > 0:
             return 0
-        elif np.array_equal(self.info_map == 9, self.mine_map):
+        elif (self.num_flagged == self.num_mines and
+              self.num_correct_flags == self.num_mines):
             return 1
-        elif num_undiscovered > 0 or num_questioned > 0:
+        elif self.num_undiscovered > 0 or self.num_questioned > 0:
             return 2
 
     def print_board(self):
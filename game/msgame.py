@@ -13,7 +13,8 @@ class MSGame(object):
     """Define a Mine Sweeper game."""
 
     def __init__(self, board_width, board_height, num_mines,
-                 port=5678, ip_add="127.0.0.1"):
+                 port=5678, ip_add="127.0.0.1", with_tcp=True,
+                 verbose=True):
         """The init function of Mine Sweeper Game.
 
         Parameters
@@ -30,6 +31,13 @@ class MSGame(object):
         ip_add : string
             the ip address for receiving the command,
             default is localhost.
+        with_tcp : bool
+            open the TCP port for remote control, default is True.
+            Without it the game lives purely in memory, so any
+            number of games can be created in one process.
+        verbose : bool
+            print a message when the game is won or lost, default is
+            True.
         """
         if (board_width <= 0):
             raise ValueError("the board width cannot be non-positive!")
@@ -52,8 +60,11 @@ class MSGame(object):
         self.BUFFER_SIZE = 1024
 
         self.move_types = ["click", "flag", "unflag", "question"]
+        self.verbose = verbose
 
-        self.init_new_game()
+        self.board = None
+        self.tcp_socket = None
+        self.init_new_game(with_tcp=with_tcp)
 
     def init_new_game(self, with_tcp=True):
         """Init a new game.
@@ -68,8 +79,13 @@ class MSGame(object):
         moves : int
             how many moves carried out.
         """
-        self.board = self.create_board(self.board_width, self.board_height,
-                                       self.num_mines)
+        if self.board is None:
+            self.board = self.create_board(self.board_width,
+                                           self.board_height,
+                                           self.num_mines)
+        else:
+            # reuse the buffers of the current board.
+            self.board.init_board()
         self.game_status = 2
         self.num_moves = 0
         self.move_history = []
@@ -123,12 +139,7 @@ class MSGame(object):
         move_y : int
             Y position of the move
         """
-        if move_type not in self.move_types:
-            raise ValueError("This is not a valid move!")
-        if move_x < 0 or move_x >= self.board_width:
-            raise ValueError("This is not a valid X position of the move!")
-        if move_y < 0 or move_y >= self.board_height:
-            raise ValueError("This is not a valid Y position of the move!")
+        self.validate_move(move_type, move_x, move_y)
 
         move_des = {}
         move_des["move_type"] = move_type
@@ -138,6 +149,26 @@ class MSGame(object):
 
         return move_des
 
+    def validate_move(self, move_type, move_x, move_y):
+        """Raise a ValueError if a move is not valid.
+
+        Parameters
+        ----------
+        move_type : string
+            one of four move types:
+            "click", "flag", "unflag", "question"
+        move_x : int
+            X position of the move
+        move_y : int
+            Y position of the move
+        """
+        if move_type not in self.move_types:
+            raise ValueError("This is not a valid move!")
+        if move_x < 0 or move_x >= self.board_width:
+            raise ValueError("This is not a valid X position of the move!")
+        if move_y < 0 or move_y >= self.board_height:
+            raise ValueError("This is not a valid Y position of the move!")
+
     def play_move(self, move_type, move_x, move_y):
         """Updat board by a given move.
 
@@ -169,18 +200,59 @@ class MSGame(object):
             self.board.question_field(move_x, move_y)
 
         # check the status, see if end the game
-        if self.board.check_board() == 0:
+        board_status = self.board.check_board()
+        if board_status == 0:
             self.game_status = 0  # game loses
             # self.print_board()
             self.end_game()
-        elif self.board.check_board() == 1:
+        elif board_status == 1:
             self.game_status = 1  # game wins
             # self.print_board()
             self.end_game()
-        elif self.board.check_board() == 2:
+        elif board_status == 2:
             self.game_status = 2  # game continues
             # self.print_board()
 
+    def play_moves(self, moves):
+        """Play a batch of moves and collect what changed.
+
+        All moves are checked before any is played, so an invalid
+        batch leaves the board untouched. The batch stops early if
+        the game ends.
+
+        Parameters
+        ----------
+        moves : list
+            (move type, X, Y) of every move, in order.
+
+        Returns
+        -------
+        diff : list
+            (X, Y, status) of every field that changed, where the
+            status is the value in the info map.
+        """
+        for move_type, move_x, move_y in moves:
+            self.validate_move(move_type, move_x, move_y)
+
+        # the board records the fields the moves touch, so only those
+        # are compared instead of the whole board.
+        self.board.changed_fields = {}
+        try:
+            for move_type, move_x, move_y in moves:
+                if self.game_status != 2:
+                    break
+                self.play_move(move_type, move_x, move_y)
+            changed_fields = self.board.changed_fields
+        finally:
+            self.board.changed_fields = None
+
+        info_map = self.board.info_map
+        return [(int(move_x), int(move_y), int(info_map[move_y, move_x]))
+                for (move_x, move_y), old_status
+                in sorted(changed_fields.items(),
+                          key=lambda field: (field[0][1], field[0][0]))
+                if info_map[move_y, move_x] != old_status]
+
     def print_board(self):
         """Print board."""
         self.board.print_board()
@@ -202,6 +274,8 @@ class MSGame(object):
 
         TODO: some more expections..
         """
+        if not self.verbose:
+            return
         if self.game_status == 0:
             print("[MESSAGE] YOU LOSE!")
         elif self.game_status == 1:
@@ -228,6 +302,24 @@ class MSGame(object):
 
         return move_type, move_x, move_y
 
+    def parse_moves(self, moves_msg):
+        """Parse a batch of moves from a string.
+
+        Parameters
+        ----------
+        moves_msg : string
+            a valid message should be in:
+            "batch: [move type]: [X], [Y]; [move type]: [X], [Y]; ..."
+
+        Returns
+        -------
+        moves : list
+            (move type, X, Y) of every move, in order.
+        """
+        moves_msg = moves_msg[moves_msg.index(":")+1:]
+        return [self.parse_move(move_msg.strip())
+                for move_msg in moves_msg.split(";") if move_msg.strip()]
+
     def play_move_msg(self, move_msg):
         """Another play move function for move message.
 
@@ -235,13 +327,39 @@ class MSGame(object):
         ----------
         move_msg : string
             a valid message should be in:
-            "[move type]: [X], [Y]"
+            "[move type]: [X], [Y]" or
+            "batch: [move type]: [X], [Y]; [move type]: [X], [Y]; ..."
+
+        Returns
+        -------
+        diff : list
+            for a batch, (X, Y, status) of every field that changed,
+            see play_moves. None for a single move.
+        """
+        if move_msg.strip().startswith("batch:"):
+            return self.play_moves(self.parse_moves(move_msg))
+        self.play_move(*self.parse_move(move_msg))
+
+    def diff_msg(self, diff):
+        """Structure the changed fields as one line.
+
+        Parameters
+        ----------
+        diff : list
+            (X, Y, status) of every field that changed.
+
+        Returns
+        -------
+        msg : string
+            "diff: [X], [Y], [status]; [X], [Y], [status]; ..."
         """
-        move_type, move_x, move_y = self.parse_move(move_msg)
-        self.play_move(move_type, move_x, move_y)
+        return "diff: "+"; ".join("%d, %d, %d" % field
+                                  for field in diff)+"\n"
 
     def tcp_accept(self):
         """Waiting for a TCP connection."""
+        if self.tcp_socket is None:
+            raise ValueError("This game was created without TCP support!")
         self.conn, self.addr = self.tcp_socket.accept()
         print("[MESSAGE] The connection is established at: ", self.addr)
         self.tcp_send("> ")
@@ -258,7 +376,11 @@ class MSGame(object):
 
     def tcp_send(self, data):
         """Send data from TCP port."""
-        self.conn.send(data)
+        if type(data) == str:
+            # Python 3 specific
+            data = data.encode("utf-8")
+
+        self.conn.sendall(data)
 
     def tcp_close(self):
         """Close Connection."""
@@ -267,12 +389,14 @@ class MSGame(object):
 
     def tcp_help(self):
         """Help message for TCP interface."""
-        help_msg = "Welcome to Mine Sweeper! \n" + \
-                   "You have 5 types of moves to use: \n" + \
-                   "(1) Click\t: click: X, Y \n" + \
-                   "(2) Flag\t: flag: X, Y \n" + \
-                   "(3) Question\t: question: X, Y\n" + \
-                   "(4) Unflag\t: unflag: X, Y\n" + \
-                   "(5) Print board: print\n"
-
-        self.tcp_send(help_msg)
+        self.tcp_send(self.help_msg())
+
+    def help_msg(self):
+        """Structure the help message of the TCP interface."""
+        return "Welcome to Mine Sweeper! \n" + \
+               "You have 5 types of moves to use: \n" + \
+               "(1) Click\t: click: X, Y \n" + \
+               "(2) Flag\t: flag: X, Y \n" + \
+               "(3) Question\t: question: X, Y\n" + \
+               "(4) Unflag\t: unflag: X, Y\n" + \
+               "(5) Print board: print\n"
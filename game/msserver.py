@@ -0,0 +1,180 @@
+"""
+Asyncio TCP server that hosts one Mine Sweeper game per connection.
+"""
+
+import asyncio
+from game.msgame import MSGame
+
+class MSServer(object):
+    """Serve Mine Sweeper games to many remote players at once."""
+
+    def __init__(self, board_width, board_height, num_mines,
+                 port=5678, ip_add="127.0.0.1", backlog=1024):
+        """The init function of the Mine Sweeper server.
+
+        Every connection plays its own game with the given settings.
+        The protocol is the one of the TCP interface of MSGame: one
+        command per line, answered with a "> " prompt.
+
+        Parameters
+        ----------
+        board_width : int
+            the width of the board (> 0)
+        board_height : int
+            the height of the board (> 0)
+        num_mines : int
+            the number of mines, cannot be larger than
+            (board_width x board_height)
+        port : int
+            TCP port number, default is 5678
+        ip_add : string
+            the ip address for receiving the command,
+            default is localhost.
+        backlog : int
+            how many connections can wait to be accepted, default is
+            1024 so that hundreds of players can connect at once.
+        """
+        # creating a game checks the settings before anyone connects.
+        MSGame(board_width, board_height, num_mines, with_tcp=False,
+               verbose=False)
+
+        self.board_width = board_width
+        self.board_height = board_height
+        self.num_mines = num_mines
+
+        self.TCP_PORT = port
+        self.TCP_IP = ip_add
+        self.backlog = backlog
+
+        self.server = None
+        self.num_clients = 0
+        self.num_games = 0
+
+    def create_game(self):
+        """Create the game of a new connection.
+
+        Returns
+        -------
+        ms_game : MSGame
+            a game without a TCP socket of its own, which doesn't
+            print the end of the game to the server's output.
+        """
+        return MSGame(self.board_width, self.board_height, self.num_mines,
+                      with_tcp=False, verbose=False)
+
+    async def start(self):
+        """Start listening for connections."""
+        self.server = await asyncio.start_server(self.handle_client,
+                                                 self.TCP_IP, self.TCP_PORT,
+                                                 backlog=self.backlog)
+        print("[MESSAGE] The server is listening at: ",
+              (self.TCP_IP, self.TCP_PORT))
+
+    async def serve_forever(self):
+        """Start the server and serve until cancelled."""
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        """Stop accepting new connections."""
+        if self.server is not None:
+            self.server.close()
+
+    async def handle_client(self, reader, writer):
+        """Play a game with one connection.
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+            the incoming side of the connection.
+        writer : asyncio.StreamWriter
+            the outgoing side of the connection.
+        """
+        ms_game = self.create_game()
+        self.num_clients += 1
+        self.num_games += 1
+
+        try:
+            writer.write(b"> ")
+            await writer.drain()
+
+            while ms_game.game_status == 2:
+                try:
+                    data = await reader.readline()
+                except ValueError:
+                    # the line is longer than the stream buffer.
+                    writer.write(b"[ERROR] The message is too long!\n")
+                    break
+                if data == b"":
+                    # the connection is closed by the other side.
+                    break
+
+                reply, keep_open = self.handle_msg(ms_game,
+                                                   data.decode("utf-8",
+                                                               "replace"))
+                writer.write(reply.encode("utf-8"))
+                await writer.drain()
+                if keep_open is False:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.num_clients -= 1
+            writer.close()
+
+    def batch_help_msg(self):
+        """Structure the help message of batched moves.
+
+        Only the server answers a batch with the fields it changed, so
+        this isn't part of the help message of MSGame.
+        """
+        return "Moves can be batched in one line, the reply lists \n" + \
+               "the changed fields as X, Y, status (0-8 revealed, \n" + \
+               "9 flagged, 10 questioned, 11 undiscovered, 12 mine): \n" + \
+               "batch: click: X, Y; flag: X, Y; ...\n"
+
+    def handle_msg(self, ms_game, msg):
+        """Handle one line from a connection.
+
+        Parameters
+        ----------
+        ms_game : MSGame
+            the game of the connection.
+        msg : string
+            the line, as "help", "print", "exit",
+            "[move type]: [X], [Y]" or
+            "batch: [move type]: [X], [Y]; [move type]: [X], [Y]; ..."
+
+        Returns
+        -------
+        reply : string
+            what to send back.
+        keep_open : bool
+            False if the connection should be closed.
+        """
+        msg = msg.strip()
+
+        if msg == "help":
+            return ms_game.help_msg()+self.batch_help_msg()+"> ", True
+        elif msg == "exit":
+            return "", False
+        elif msg == "print":
+            return ms_game.get_board()+"> ", True
+        elif msg == "":
+            return "> ", True
+
+        try:
+            diff = ms_game.play_move_msg(msg)
+        except ValueError:
+            return "[ERROR] This is not a valid move!\n> ", True
+
+        # a batch is answered with every field it changed, so the
+        # player doesn't need to print the board after it.
+        reply = ms_game.diff_msg(diff) if diff is not None else ""
+        if ms_game.game_status == 1:
+            return reply+"[MESSAGE] YOU WIN!\n", False
+        elif ms_game.game_status == 0:
+            return reply+"[MESSAGE] YOU LOSE!\n", False
+        return reply+"> ", True
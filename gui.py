@@ -15,9 +15,8 @@ except ImportError:
     from PyQt5.QtWidgets import QPushButton, QLCDNumber
 
 import minesweeper
-from solver import MineSAT
+from solver import MineSATSession
 
-get_symbol = '012345678..???'
 SAFE_TILE = 13
 
 FLAG_PATH = join(minesweeper.PACKAGE_IMGS_PATH, "flag.png")
@@ -76,6 +75,8 @@ class GameWidget(QWidget):
 
         self.ms_game = ms_game
         self.ctrl_wg = ctrl_wg
+        # Solver session for the current game, created on the first update
+        self.session = None
         self.init_ui()
 
     def init_ui(self):
@@ -115,6 +116,7 @@ class GameWidget(QWidget):
     def reset_game(self):
         """Reset game board."""
         self.ms_game.reset_game()
+        self.session = None
         self.update_grid()
         self.time = 0
         self.timer.start(1000)
@@ -123,15 +125,12 @@ class GameWidget(QWidget):
         """Update grid according to info map."""
         info_map = self.ms_game.get_info_map()
 
-        WIDTH = self.ms_game.board_width
-        HEIGHT = self.ms_game.board_height
-
-        solver_board = ['' for j in range(HEIGHT)]
-        for i in range(HEIGHT):
-            for j in range(WIDTH):
-                solver_board[i] = solver_board[i] + get_symbol[info_map[i][j]]
-        solver = MineSAT(solver_board)
-        safe_tiles = solver.find_tiles()
+        # The solver reads the info map as-is
+        if self.session is None:
+            self.session = MineSATSession(info_map, total_mines=self.ms_game.num_mines)
+        else:
+            self.session.update(info_map)
+        safe_tiles = self.session.find_tiles()
 
         for i in range(self.ms_game.board_height):
             for j in range(self.ms_game.board_width):
@@ -0,0 +1,201 @@
+import argparse
+import numpy as np
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from game.msboard import MSBoard
+from solver import BACKENDS, MineSATSession, PatternStore
+from time import perf_counter
+from typing import List, Optional, Tuple
+
+# (width, height, mines) for each of the classic presets
+PRESETS = {
+    "beginner": (9, 9, 10),
+    "intermediate": (16, 16, 40),
+    "expert": (30, 16, 99),
+}
+
+def play_game(width: int, height: int, num_mines: int, seed: int,
+              patterns: Optional[PatternStore] = None, backend: str = "cp-sat",
+              row_reduce: bool = False) -> Tuple[bool, int, List[float]]:
+    """
+        Plays a single game with the solver, straight on an MSBoard so there's no printing, sleeping
+        or sockets involved. Returns whether it was won, how many moves were made, and how long
+        each solver turn took (in seconds).
+    """
+    np.random.seed(seed)
+    board = MSBoard(width, height, num_mines)
+    session = MineSATSession(board.info_map, total_mines=num_mines, patterns=patterns, backend=backend,
+                             row_reduce=row_reduce)
+    moves = 0
+    turn_times = []
+
+    status = 2  # In progress
+    while status == 2:
+        start = perf_counter()
+        session.update(board.info_map)
+        safe_tiles, mine_tiles, _ = session.find_all()
+        if safe_tiles:
+            probabilities = {}
+        else:
+            probabilities = session.mine_probabilities()
+        turn_times.append(perf_counter() - start)
+
+        if safe_tiles:
+            for row, col in safe_tiles:
+                board.click_field(col-1, row-1)  # The solver is 1-indexed
+                moves += 1
+        else:
+            # Same as auto_play in simulator-cl.py: go with the best odds, or flag the rest if only mines are left
+            candidates = {tile: p for tile, p in probabilities.items() if p < 1}
+            if candidates:
+                row, col = min(candidates, key=candidates.get)
+                board.click_field(col-1, row-1)
+                moves += 1
+            else:
+                for row, col in mine_tiles:
+                    board.flag_field(col-1, row-1)
+                    moves += 1
+                if not mine_tiles:  # Nothing left to do, but the game never finished
+                    break
+        status = board.check_board()
+
+    return status == 1, moves, turn_times
+
+
+def _play_game(args: Tuple[int, int, int, int, Optional[PatternStore], str, bool]) -> Tuple[bool, int, List[float]]:
+    # ProcessPoolExecutor.map only hands over one argument
+    return play_game(*args)
+
+
+def run_benchmark(width: int, height: int, num_mines: int, games: int,
+                  seed: int = 0, processes: int = 1, patterns: Optional[PatternStore] = None,
+                  backend: str = "cp-sat", row_reduce: bool = False) -> dict:
+    """
+        Plays games with seeds seed, seed+1, ..., so runs are repeatable, optionally across
+        several processes. Returns the stats that get printed by main.
+        With a pattern store, the games share it. Worker processes only read the saved file, so
+        patterns only get added when playing in a single process.
+    """
+    jobs = [(width, height, num_mines, seed+i, patterns, backend, row_reduce) for i in range(games)]
+    start = perf_counter()
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_play_game, jobs, chunksize=max(1, games // (processes*4))))
+    else:
+        results = [_play_game(job) for job in jobs]
+    elapsed = perf_counter() - start
+
+    wins = sum(won for won, _, _ in results)
+    moves = sum(num_moves for _, num_moves, _ in results)
+    turn_times = np.array([t for _, _, times in results for t in times])
+    return {
+        "games": games,
+        "wins": wins,
+        "win_rate": wins / games,
+        "elapsed": elapsed,
+        "games_per_second": games / elapsed,
+        "moves": moves,
+        "turns": len(turn_times),
+        "solver_time_per_move": turn_times.sum() / max(moves, 1),
+        "turn_percentiles": dict(zip((50, 90, 99), np.percentile(turn_times, (50, 90, 99)))),
+        "turn_max": turn_times.max(),
+    }
+
+
+# Run in a fresh interpreter by measure_startup: does what the interfaces do before showing the first hint
+STARTUP_SCRIPT = """
+import sys
+from time import perf_counter
+start = perf_counter()
+import numpy as np
+from game.msboard import MSBoard
+from solver import MineSATSession
+imported = perf_counter()
+np.random.seed({seed})
+board = MSBoard({width}, {height}, {num_mines})
+safe_rows, safe_cols = np.nonzero(board.count_map + board.mine_map == 0)
+if len(safe_rows):
+    board.click_field(safe_cols[0], safe_rows[0])
+MineSATSession(board.info_map, total_mines={num_mines}, backend={backend!r}).find_all()
+print(imported - start, perf_counter() - imported, "ortools" in sys.modules)
+"""
+
+def measure_startup(width: int, height: int, num_mines: int, runs: int,
+                    seed: int = 0, backend: str = "cp-sat") -> dict:
+    """
+        Launches a fresh interpreter per run that imports the solver and analyses the opening of a game,
+        the way the command-line and graphical interfaces start up. Every run uses its own seed.
+        Returns the stats that get printed by main.
+    """
+    launch_times, import_times, first_times, loaded_ortools = [], [], [], 0
+    for i in range(runs):
+        script = STARTUP_SCRIPT.format(width=width, height=height, num_mines=num_mines, seed=seed+i,
+                                       backend=backend)
+        start = perf_counter()
+        output = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stdout.split()
+        launch_times.append(perf_counter() - start)
+        import_times.append(float(output[0]))
+        first_times.append(float(output[1]))
+        loaded_ortools += output[2] == "True"
+    return {
+        "runs": runs,
+        "launch": np.median(launch_times),
+        "imports": np.median(import_times),
+        "first_analysis": np.median(first_times),
+        "loaded_ortools": loaded_ortools,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Minesweeper benchmark: plays games with "
+                                                 "the solver and reports how it did.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="expert",
+                        help="board size and number of mines.")
+    parser.add_argument("--games", type=int, default=100,
+                        help="number of games to play.")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the first game, the rest count up from it.")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="number of processes to play the games in.")
+    parser.add_argument("--patterns", type=str, default=None,
+                        help="pattern store file to start from, and to save new patterns to.")
+    parser.add_argument("--backend", choices=BACKENDS, default="cp-sat",
+                        help="how the solver settles tiles.")
+    parser.add_argument("--row-reduce", action="store_true",
+                        help="decide what row reduction can before the backend gets the rest.")
+    parser.add_argument("--startup", action="store_true",
+                        help="measure cold starts instead: launch --games fresh interpreters that each "
+                             "import the solver and analyse one opening.")
+    args = parser.parse_args()
+
+    width, height, num_mines = PRESETS[args.preset]
+    if args.startup:
+        stats = measure_startup(width, height, num_mines, args.games, seed=args.seed, backend=args.backend)
+        print(f"Preset: {args.preset} ({width}x{height}, {num_mines} mines), {stats['runs']} cold starts")
+        print(f"Median launch to first analysis: {stats['launch']*1000:.1f}ms "
+              f"(imports {stats['imports']*1000:.1f}ms, first analysis {stats['first_analysis']*1000:.1f}ms)")
+        print(f"OR-Tools was imported in {stats['loaded_ortools']} of {stats['runs']} runs")
+        return
+
+    patterns = PatternStore(args.patterns) if args.patterns else None
+    stats = run_benchmark(width, height, num_mines, args.games, seed=args.seed, processes=args.processes,
+                          patterns=patterns, backend=args.backend, row_reduce=args.row_reduce)
+    if patterns is not None:
+        patterns.save()
+
+    print(f"Preset: {args.preset} ({width}x{height}, {num_mines} mines)")
+    print(f"Games: {stats['games']}, won {stats['wins']} ({stats['win_rate']:.1%})")
+    print(f"Time: {stats['elapsed']:.2f}s, {stats['games_per_second']:.2f} games/second")
+    print(f"Moves: {stats['moves']} over {stats['turns']} solver turns")
+    print(f"Solver time per move: {stats['solver_time_per_move']*1000:.3f}ms")
+    print("Solver time per turn: " + ", ".join(f"p{p} {t*1000:.3f}ms" for p, t in stats["turn_percentiles"].items())
+          + f", max {stats['turn_max']*1000:.3f}ms")
+    if patterns is not None:
+        print(f"Pattern store: {len(patterns)} patterns in {args.patterns}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,26 @@
 import os
 import sys
+import numpy as np
 from game.msgame import MSGame
-from solver import MineSAT
+from solver import MineSATSession
 from random import sample
-from typing import Tuple, List, Optional
+from typing import Dict, Tuple, List, Optional
 from time import sleep
 
-#GAME = MSGame(8, 8, 10, 5684, "127.0.0.1")    # 8x8, 10 minutes: "Basic" preset
-GAME = MSGame(16, 16, 40, 5684, "127.0.0.1")  # 16x16, 40 mines: "Intermediate" preset
-#GAME = MSGame(30, 16, 99, 5684, "127.0.0.1")  # 16x30, 99 mines: "Advanced" preset
+#GAME = MSGame(8, 8, 10, 5684, "127.0.0.1", with_tcp=False)    # 8x8, 10 minutes: "Basic" preset
+GAME = MSGame(16, 16, 40, 5684, "127.0.0.1", with_tcp=False)  # 16x16, 40 mines: "Intermediate" preset
+#GAME = MSGame(30, 16, 99, 5684, "127.0.0.1", with_tcp=False)  # 16x30, 99 mines: "Advanced" preset
 WIDTH = GAME.board.board_width
 HEIGHT = GAME.board.board_height
 # To keep track of tiles we don't want to pick, either discovered+safe or mine
 UNDISCOVERED_TILES = set( (x, y) for x in range(1, WIDTH+1) for y in range(1, HEIGHT+1) )
-# Mapping each entry in the numpy array to its character representation
-GET_SYMBOL = '012345678..?'
 
 # Cross-platform (Windows and POSIX, at least) screen clearing
 clear_screen = lambda: os.system("cls" if os.name=="nt" else "clear")
 
 def main():
+    # One solver session for the whole game, so nothing learned is thrown away between turns
+    solver = MineSATSession(update_board(GAME.board.info_map), total_mines=GAME.num_mines)
     while True:
         clear_screen()
         print(GAME.get_board())
@@ -31,9 +32,8 @@ def main():
             print("[MESSAGE] YOU LOSE!\n")
             break
 
-        # Create board representation for the solver
-        board = update_board(GAME.board.info_map)
-        solver = MineSAT(board)
+        # Bring the solver up to date with the board
+        solver.update(update_board(GAME.board.info_map))
         
         print("Options:")
         print("P) Play the game automatically!")
@@ -84,7 +84,7 @@ def main():
                 moveX = move[1]; moveY = move[0];
             moveX -= 1; moveY -= 1  # 1-indexed adjustment
         elif move == "p":
-            auto_play()
+            auto_play(session=solver)
             continue
         else:
             print("Invalid input. Stop that! >:(")
@@ -113,21 +113,15 @@ def get_coord_input() -> Tuple[int, int]:
         usr_input = input("ERROR: No valid coordinate pair found.\nEnter the tile's coordinates in row, col order: ").replace(",", " ").replace(";", " ").split(" ")
 
 
-def update_board(np_game_board) -> List[str]:
+def update_board(np_game_board):
     """
-        Helper function to generate a string representation of the board.
-        Also updates the set of unknown tiles, for use when randomly selecting tiles.
+        Helper function to update the set of unknown tiles, for use when randomly selecting tiles.
+        Returns the board itself, since the solver reads the numpy array directly.
     """
-    np_board = np_game_board
-    board = ['' for j in range(HEIGHT)]
-    for i in range(HEIGHT):
-        for j in range(WIDTH):
-            board[i] = board[i] + GET_SYMBOL[np_board[i][j]]
-            # If we have a discovered tile, update our set
-            if 0 <= np_board[i][j] <= 8:
-                if (i+1, j+1) in UNDISCOVERED_TILES:  # np_board is 0-indexed, und_tiles is 1-indexed
-                    UNDISCOVERED_TILES.remove( (i+1, j+1) )  # Throws a KeyError if (i, j) isn't in set
-    return board
+    # If we have a discovered tile, update our set
+    for i, j in zip(*np.nonzero(np_game_board <= 8)):
+        UNDISCOVERED_TILES.discard( (i+1, j+1) )  # np_board is 0-indexed, und_tiles is 1-indexed
+    return np_game_board
 
 
 def flag_tile(moveX: int, moveY: int):
@@ -157,29 +151,42 @@ def pick_random_tile(mine_tiles: List[Tuple[int, int]]) -> Optional[Tuple[int, i
         UNDISCOVERED_TILES.remove( (moveX, moveY) )
     return moveX, moveY
 
-def auto_play(sleep_timer: float=2.0):
+def pick_safest_tile(probabilities: Dict[Tuple[int, int], float]) -> Optional[Tuple[int, int]]:
+    """
+        Helper function to select the tile least likely to be a mine, skipping guaranteed mines.
+        Returns None if there's nothing left to click.
+    """
+    candidates = {tile: p for tile, p in probabilities.items() if p < 1}
+    if not candidates:
+        return None
+    return min(candidates, key=candidates.get)
+
+def auto_play(sleep_timer: float=2.0, session: Optional[MineSATSession]=None):
     """
         Automatically play the game.
     """
+    solver = session
+    if solver is None:
+        solver = MineSATSession(update_board(GAME.board.info_map), total_mines=GAME.num_mines)
     while GAME.game_status == 2:  # In progress
         clear_screen()
         print(GAME.get_board())
         # First get the board state
-        board = update_board(GAME.board.info_map)
-        solver = MineSAT(board)
+        solver.update(update_board(GAME.board.info_map))
 
         # Find out if it can make any moves
-        safe_tiles = solver.find_tiles()
-        if not safe_tiles:  # If not, say a prayer and hope for the best
-            mine_tiles = solver.find_tiles("mine")
-            move = pick_random_tile(mine_tiles)
-            if move is None:  # No more undiscovered tiles, flag the mine tiles and win!
-                print("No more random tiles, flagging all mines")
+        safe_tiles, mine_tiles, _ = solver.find_all()
+        if not safe_tiles:  # If not, say a prayer and go with the best odds
+            probabilities = solver.mine_probabilities()
+            move = pick_safest_tile(probabilities)
+            if move is None:  # Only mines left, flag them and win!
+                print("No more safe tiles, flagging all mines")
                 for moveY, moveX in mine_tiles:
                     GAME.play_move("flag", moveX-1, moveY-1)
             else:
-                moveX = move[1]; moveY = move[0];
-                print(f"Couldn't find a safe tile. Randomly clicking row {moveY-1}, column {moveX-1}")
+                moveY, moveX = move
+                print(f"Couldn't find a safe tile. Clicking row {moveY-1}, column {moveX-1} "
+                      f"({probabilities[move]:.0%} chance of a mine)")
                 GAME.play_move("click", moveX-1, moveY-1)
         else:  # Otherwise, play any safe moves
             for moveY, moveX in safe_tiles:
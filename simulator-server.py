@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+
+from game.msserver import MSServer
+
+# Modify the dimensions of the board and the number of mines
+HEIGHT = 9
+WIDTH = 9
+NUM_MINES = 10
+
+def ms_server_main(board_width, board_height, num_mines, port, ip_add):
+    """Main function for the Mine Sweeper server.
+
+    Every connection gets a game of its own, so any number of remote
+    players can play against one process.
+
+    Parameters
+    ----------
+    board_width : int
+        the width of the board (> 0)
+    board_height : int
+        the height of the board (> 0)
+    num_mines : int
+        the number of mines, cannot be larger than
+        (board_width x board_height)
+    port : int
+        TCP port number, default is 5678
+    ip_add : string
+        the ip address for receiving the command,
+        default is localhost.
+    """
+    ms_server = MSServer(board_width, board_height, num_mines,
+                         port=port, ip_add=ip_add)
+
+    try:
+        asyncio.run(ms_server.serve_forever())
+    except KeyboardInterrupt:
+        print("[MESSAGE] The server is stopped after %d games."
+              % ms_server.num_games)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mine Sweeper server that \
+                                                  hosts a game for every \
+                                                  TCP connection")
+    parser.add_argument("--board-width", type=int,
+                        default=WIDTH,
+                        help="width of the board.")
+    parser.add_argument("--board-height", type=int,
+                        default=HEIGHT,
+                        help="height of the board.")
+    parser.add_argument("--num-mines", type=int,
+                        default=NUM_MINES,
+                        help="number of mines.")
+    parser.add_argument("--port", type=int,
+                        default=5678,
+                        help="The port for TCP connection.")
+    parser.add_argument("--ip-add", type=str,
+                        default="127.0.0.1",
+                        help="The IP address for TCP connection.")
+    args = parser.parse_args()
+    ms_server_main(**vars(args))
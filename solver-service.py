@@ -0,0 +1,212 @@
+import argparse
+import asyncio
+from functools import partial
+import json
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from solver import (BACKENDS, BoardAnalysis, CanonicalBoard, PatternStore, PositionCache, _import_cp_model,
+                    analyse_board)
+from typing import Any, Dict, Optional, Tuple
+
+def _warm_up(solver_options: Dict[str, Any]):
+    """
+        Runs once in every worker process: imports OR-Tools and solves a tiny model so CP-SAT has
+        done its first-time setup (unless the counting backend is used, which never needs it), then
+        analyses a tiny board with the service's options, all before any real request comes in.
+        The solver only imports OR-Tools once it builds a model, and this board never needs one.
+    """
+    if solver_options.get("backend", "cp-sat") == "cp-sat":
+        cp_model = _import_cp_model()
+        model = cp_model.CpModel()
+        model.Add(model.NewBoolVar("mine") == 1)
+        cp_model.CpSolver().Solve(model)
+    analyse_board(["1?"], total_mines=1, **solver_options)
+
+
+class SolverService:
+    """
+        Long-running solver that other processes talk to over TCP (or a Unix socket), one JSON request
+        per line. The workers stay up between requests, and recently seen positions (in any of their
+        8 orientations) are answered from a PositionCache without solving them again.
+
+        Request:  {"board": ["12?", ...] or [[1, 2, 11], ...], "total_mines": 10, "probabilities": true}
+        Response: {"safe": [[row, col], ...], "mine": [...], "undecided": [...],
+                   "probabilities": [[row, col, p], ...] or null, "cached": false}
+        Send {"stats": true} to get the request and cache counters instead, anything broken gets {"error": ...}.
+        Any other keyword arguments go to MineSAT for every request, e.g. backend, row_reduce or patterns.
+        A pattern store is only read by the workers (each one opens the file), never added to.
+    """
+    def __init__(self, num_processes: int = 2, cache_size: int = 1024, **solver_options):
+        self.num_processes = num_processes
+        self.solver_options = solver_options
+        self.pool = None
+        self.server = None
+        self.cache = PositionCache(max_size=cache_size, **solver_options)
+        # Key -> future of a solve that's still running, so a position sent twice at once is solved once
+        self.pending = {}
+        self.stats = {"requests": 0, "hits": 0, "solves": 0, "errors": 0}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 5679, path: Optional[str] = None):
+        """
+            Starts the workers (warming each one up) and starts listening, on the Unix socket at path
+            if one is given and on host:port otherwise.
+        """
+        self.pool = ProcessPoolExecutor(max_workers=self.num_processes, initializer=_warm_up,
+                                        initargs=(self.solver_options,))
+        # Workers are started (and so warmed up) lazily, so give each one a task that does nothing to
+        # get them all going now instead of on the first requests
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.pool, int) for _ in range(self.num_processes)])
+
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle_client, path)
+        else:
+            self.server = await asyncio.start_server(self.handle_client, host, port, backlog=1024)
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 5679, path: Optional[str] = None):
+        if self.server is None:
+            await self.start(host, port, path)
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+            Answers requests from one connection until it closes. Requests are answered in order,
+            so a client can send several before reading the responses.
+        """
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # Longer than the stream buffer
+                    writer.write(b'{"error": "request too long"}\n')
+                    break
+                if not line:
+                    break
+                response = await self.handle_request(line)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, line: bytes) -> Dict[str, Any]:
+        self.stats["requests"] += 1
+        try:
+            request = json.loads(line)
+            if request.get("stats"):
+                return dict(self.stats, cache=self.cache.stats())
+            key, canonical, total_mines, probabilities = self._parse(request)
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            self.stats["errors"] += 1
+            return {"error": f"bad request: {e}"}
+
+        # Everything below works on the canonical board, and is only turned back for the response
+        analysis = self.cache.get(key)
+        if analysis is not None:
+            self.stats["hits"] += 1
+            return dict(self._response(analysis, canonical), cached=True)
+
+        if key in self.pending:
+            self.stats["hits"] += 1
+            analysis = await self.pending[key]
+            if analysis is None:
+                return {"error": "solver failed"}
+            return dict(self._response(analysis, canonical), cached=True)
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = future
+        try:
+            analysis = await asyncio.get_running_loop().run_in_executor(
+                self.pool, partial(analyse_board, canonical.info_map, total_mines, probabilities,
+                                   **self.solver_options))
+        except Exception as e:
+            self.stats["errors"] += 1
+            future.set_result(None)
+            return {"error": f"solver failed: {e}"}
+        finally:
+            del self.pending[key]
+        self.stats["solves"] += 1
+        self.cache.put(key, analysis)
+        future.set_result(analysis)
+        return dict(self._response(analysis, canonical), cached=False)
+
+    @staticmethod
+    def _parse(request: Dict[str, Any]) -> Tuple[tuple, CanonicalBoard, Optional[int], bool]:
+        """
+            Turns a request into its cache key and the solver's arguments. Boards given as strings and
+            as info maps end up as the same canonical board, so they share cache entries.
+        """
+        board = request["board"]
+        if board and isinstance(board[0], str):
+            grid = len(board[0]) > 0
+        else:
+            board = np.array(board)
+            grid = board.ndim == 2 and board.size > 0
+        if not grid:
+            raise ValueError("the board must be a non-empty grid")
+
+        total_mines = request.get("total_mines")
+        if total_mines is not None:
+            total_mines = int(total_mines)
+        probabilities = bool(request.get("probabilities", True))
+        canonical = PositionCache.canonical(board)
+        return (canonical.key, total_mines, probabilities), canonical, total_mines, probabilities
+
+    @staticmethod
+    def _response(analysis: BoardAnalysis, canonical: CanonicalBoard) -> Dict[str, Any]:
+        analysis = PositionCache.to_board(analysis, canonical)
+        probabilities = analysis.probabilities
+        if probabilities is not None:
+            probabilities = [[row, col, p] for (row, col), p in probabilities.items()]
+        return {
+            "safe": analysis.safe_tiles,
+            "mine": analysis.mine_tiles,
+            "undecided": analysis.undecided_tiles,
+            "probabilities": probabilities,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minesweeper solver service: answers JSON boards sent "
+                                                 "over TCP or a Unix socket, one per line.")
+    parser.add_argument("--port", type=int, default=5679,
+                        help="The port for TCP connections.")
+    parser.add_argument("--ip-add", type=str, default="127.0.0.1",
+                        help="The IP address for TCP connections.")
+    parser.add_argument("--unix-socket", type=str, default=None,
+                        help="listen on this Unix socket path instead of TCP.")
+    parser.add_argument("--processes", type=int, default=2,
+                        help="number of warm solver processes.")
+    parser.add_argument("--cache-size", type=int, default=1024,
+                        help="number of recently seen positions to remember.")
+    parser.add_argument("--backend", choices=BACKENDS, default="cp-sat",
+                        help="how the solver settles tiles.")
+    parser.add_argument("--row-reduce", action="store_true",
+                        help="decide what row reduction can before the backend gets the rest.")
+    parser.add_argument("--patterns", type=str, default=None,
+                        help="pattern store file for the workers to read solved patterns from.")
+    args = parser.parse_args()
+
+    solver_options = {"backend": args.backend, "row_reduce": args.row_reduce}
+    if args.patterns:
+        solver_options["patterns"] = PatternStore(args.patterns)
+    service = SolverService(num_processes=args.processes, cache_size=args.cache_size, **solver_options)
+    try:
+        asyncio.run(service.serve_forever(args.ip_add, args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        print(f"Stopped after {service.stats['requests']} requests, {service.stats['hits']} from the cache")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,69 +1,1397 @@
-from ortools.sat.python import cp_model
-from typing import Optional, Tuple, List
+from __future__ import annotations
+from bisect import bisect_right
+from collections import OrderedDict, deque
+import hashlib
+from itertools import islice
+from math import ceil, comb
+import mmap
+import numpy as np
+import os
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple, List, Union
+
+if TYPE_CHECKING:
+    # Process pools (and the multiprocessing machinery behind them) are imported where they're started
+    from concurrent.futures import Executor
 
 # Special typing
 Coordinate = Tuple[int, int]
+# Number of mines -> number of ways to place them, e.g. {2: 3} is "3 solutions with 2 mines"
+MineCounts = Dict[int, int]
+# A board is either a list of strings ("012345678" revealed, "?" hidden, anything else e.g. "." flagged),
+# or an MSBoard info map (0-8 revealed, 9/10 flagged/questioned, 11 and up hidden)
+Board = Union[List[str], np.ndarray]
+# OR-Tools takes longer to import than everything else put together, and plenty of boards are settled
+# without it (by propagation or the counting backend), so it's only imported once a model is needed
+cp_model = None
+
+
+def _import_cp_model():
+    global cp_model
+    if cp_model is None:
+        from ortools.sat.python import cp_model
+    return cp_model
+
+
+# How MineSAT can settle the tiles: CP-SAT probes, or counting every solution in pure Python
+BACKENDS = ("cp-sat", "counting")
+# Info map values for board characters, used to read string boards with numpy
+_CHAR_VALUES = np.full(256, 9, dtype=np.uint8)
+_CHAR_VALUES[[ord(ch) for ch in "012345678"]] = np.arange(9)
+_CHAR_VALUES[ord("?")] = 11
+
+
+def _info_map(board: Board) -> np.ndarray:
+    """
+        Gives the board as a (fresh) info map, whichever way it came in.
+    """
+    if isinstance(board, np.ndarray):
+        return board.astype(np.uint8, copy=True)
+    return _CHAR_VALUES[np.frombuffer("".join(board).encode(), dtype=np.uint8)].reshape(len(board), -1)
+
+
+def _tiles(mask: np.ndarray) -> List[Coordinate]:
+    """
+        The (1-indexed) tiles where mask is set, in row-major order.
+    """
+    rows, cols = np.nonzero(mask)
+    return list(zip((rows+1).tolist(), (cols+1).tolist()))
+
+
+class BoardAnalysis(NamedTuple):
+    """
+        Everything analyse_boards finds out about a single board.
+    """
+    safe_tiles: List[Coordinate]
+    mine_tiles: List[Coordinate]
+    undecided_tiles: List[Coordinate]
+    probabilities: Optional[Dict[Coordinate, float]]
+
+
+def _convolve(a: MineCounts, b: MineCounts) -> MineCounts:
+    """
+        Combines the counts of two independent groups of tiles into the counts of both together.
+    """
+    out: MineCounts = {}
+    for i, x in a.items():
+        for j, y in b.items():
+            out[i+j] = out.get(i+j, 0) + x*y
+    return out
+
+
+def _integer_rref(matrix: np.ndarray) -> np.ndarray:
+    """
+        Gauss-Jordan elimination of an integer matrix (the last column being the right-hand side),
+        staying in integers: rows are combined by cross-multiplying and then divided by their gcd.
+        Every row that comes out is still a valid equation, so the result can be stopped early.
+    """
+    matrix = matrix.copy()
+    rank = 0
+    for col in range(matrix.shape[1] - 1):
+        if rank == len(matrix):
+            break
+        nonzero = np.flatnonzero(matrix[rank:, col])
+        if not len(nonzero):
+            continue
+        matrix[[rank, rank + nonzero[0]]] = matrix[[rank + nonzero[0], rank]]
+        pivot = matrix[rank]
+        others = np.flatnonzero(matrix[:, col])
+        others = others[others != rank]
+        if len(others):
+            matrix[others] = matrix[others]*pivot[col] - np.outer(matrix[others, col], pivot)
+            divisors = np.gcd.reduce(matrix[others], axis=1)
+            matrix[others] //= np.maximum(divisors, 1)[:, None]
+        rank += 1
+        # Minesweeper coefficients stay tiny, but stop well before anything could overflow
+        if np.abs(matrix).max() > 1 << 31:
+            break
+    return matrix
+
+
+def _bound_forced(matrix: np.ndarray, upper: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+        Bound reasoning on rows a.x = b with every x between 0 and its upper bound (1 for a tile).
+        The sum can go as low as the negative terms and as high as the positive ones. A column whose
+        coefficient is bigger than the room left between b and one of those ends can't move off
+        that end, i.e. it's stuck at 0 (safe) or at its upper bound (mines).
+        Returns the (safe, mine) masks over the columns, or None if some row can't be met at all.
+    """
+    a, b = matrix[:, :-1], matrix[:, -1]
+    low = (b - (np.minimum(a, 0)*upper).sum(axis=1))[:, None]
+    high = ((np.maximum(a, 0)*upper).sum(axis=1) - b)[:, None]
+    if (low < 0).any() or (high < 0).any():
+        return None
+    can_be_mine = (np.abs(a) <= np.where(a > 0, low, high)).all(axis=0)
+    can_be_safe = (np.abs(a) <= np.where(a > 0, high, low)).all(axis=0)
+    if not (can_be_mine | can_be_safe).all():
+        return None
+    return ~can_be_mine, ~can_be_safe
+
+
+def _pool_size(num_processes: Optional[int], executor: Optional[Executor]) -> int:
+    """
+        How many workers to split the work between. Executors don't say how many workers they have,
+        so pass num_processes along with one to match its size, without it the executor is assumed to
+        have one per CPU. Without an executor, num_processes defaults to a single process.
+    """
+    if num_processes is not None:
+        return num_processes
+    if executor is None:
+        return 1
+    return os.cpu_count() or 1
+
+
+def _backbone_worker(board: Board, options: Dict[str, Any],
+                     jobs: List[Tuple[int, List[Coordinate]]]) -> List[Tuple[set, set]]:
+    """
+        Runs in a worker process: rebuilds the solver from scratch and works through its share of
+        (group, tiles) backbone jobs. Models can't be pickled, but a board and some options can.
+    """
+    solver = MineSAT(board, **options)
+    return [solver._group_backbone(group, tiles) for group, tiles in jobs]
+
+
+class PatternStore:
+    """
+        On-disk database of solved frontier components, so a fresh process doesn't start cold.
+        A component is filed under its pattern: its tiles and the numbers around them (moved so the
+        pattern starts at row/column 0), plus which of its tiles were already known. For each pattern
+        it keeps the count distribution found by MineSAT._count_solutions, which also gives the forced
+        tiles (the ones that are a mine in none or in all of the solutions).
+
+        The file is opened with a read-only mmap and read without copying, so any number of worker
+        processes can share it. Patterns solved since opening are kept in memory until save(), which
+        writes a new file next to the old one and swaps it in, so readers never see a half-written file.
+        Only one process should save to a path at a time.
+
+        File layout (little-endian), every part 8-byte aligned:
+            header:  b"MSPATDB1", number of records (uint64)
+            index:   hash of every key (uint64, sorted), then the offset of its record (uint64)
+            records: key length in bytes (uint32), payload length in words (uint32), key, payload
+        Keys are int16 arrays, payloads are uint64 arrays: the lowest mine count k0, how many mine
+        counts follow (n), the solutions for each of k0..k0+n-1 mines, then the same n counts for the
+        solutions where each tile (in key order) is a mine.
+    """
+    MAGIC = b"MSPATDB1"
+    # Components with more undecided tiles than this are left to CP-SAT, both to keep counting cheap
+    # and to keep every count well inside a uint64
+    max_tiles = 32
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._file = None
+        self._mmap = None
+        self._hashes = np.zeros(0, dtype="<u8")
+        self._offsets = np.zeros(0, dtype="<u8")
+        # Key -> payload for the patterns solved since the file was opened
+        self._new: Dict[bytes, np.ndarray] = {}
+        if path is not None and os.path.exists(path):
+            self._open(path)
+
+    def _open(self, path: str):
+        self._file = open(path, "rb")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            return
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:8] != self.MAGIC:
+            raise ValueError(f"{path} is not a pattern store")
+        count = int(np.frombuffer(self._mmap, dtype="<u8", count=1, offset=8)[0])
+        self._hashes = np.frombuffer(self._mmap, dtype="<u8", count=count, offset=16)
+        self._offsets = np.frombuffer(self._mmap, dtype="<u8", count=count, offset=16 + 8*count)
+
+    def close(self):
+        # The index arrays are views into the mmap, they have to go before it can be closed
+        self._hashes = np.zeros(0, dtype="<u8")
+        self._offsets = np.zeros(0, dtype="<u8")
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self) -> int:
+        return len(self._hashes) + len(self._new)
+
+    def __getstate__(self) -> dict:
+        # mmaps can't be pickled, so worker processes just open the file themselves
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict):
+        self.__init__(state["path"])
+
+    @staticmethod
+    def _hash(key: bytes) -> int:
+        # Has to be the same in every process, which the built-in hash isn't
+        return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+    def _records(self) -> Iterator[Tuple[bytes, np.ndarray]]:
+        for offset in self._offsets.tolist():
+            key_length, payload_length = np.frombuffer(self._mmap, dtype="<u4", count=2, offset=offset).tolist()
+            key_start = offset + 8
+            payload_start = key_start + -(-key_length // 8) * 8
+            yield (self._mmap[key_start:key_start+key_length],
+                   np.frombuffer(self._mmap, dtype="<u8", count=payload_length, offset=payload_start))
+
+    def _find(self, key: bytes) -> Optional[np.ndarray]:
+        if key in self._new:
+            return self._new[key]
+        if self._mmap is None:
+            return None
+        key_hash = self._hash(key)
+        i = int(np.searchsorted(self._hashes, key_hash))
+        while i < len(self._hashes) and int(self._hashes[i]) == key_hash:
+            offset = int(self._offsets[i])
+            key_length, payload_length = np.frombuffer(self._mmap, dtype="<u4", count=2, offset=offset).tolist()
+            key_start = offset + 8
+            if self._mmap[key_start:key_start+key_length] == key:
+                payload_start = key_start + -(-key_length // 8) * 8
+                return np.frombuffer(self._mmap, dtype="<u8", count=payload_length, offset=payload_start)
+            i += 1
+        return None
+
+    def get(self, key: bytes) -> Optional[Tuple[MineCounts, List[MineCounts]]]:
+        """
+            The (solutions by mine count, and per tile in key order the solutions where it's a mine)
+            stored for a pattern, or None if it hasn't been solved yet.
+        """
+        payload = self._find(key)
+        if payload is None:
+            return None
+        k0, n = int(payload[0]), int(payload[1])
+        rows = payload[2:].reshape(-1, n).tolist()
+        unpack = lambda row: {k0+k: ways for k, ways in enumerate(row) if ways}
+        return unpack(rows[0]), [unpack(row) for row in rows[1:]]
+
+    def put(self, key: bytes, totals: MineCounts, tile_counts: List[MineCounts]):
+        if not totals:
+            return  # Nothing fits, which says more about the board than the pattern
+        k0, n = min(totals), max(totals) - min(totals) + 1
+        payload = np.zeros((1 + len(tile_counts), n), dtype="<u8")
+        for row, counts in zip(payload, [totals] + tile_counts):
+            for k, ways in counts.items():
+                row[k-k0] = ways
+        self._new[key] = np.concatenate([np.array([k0, n], dtype="<u8"), payload.ravel()])
+
+    def save(self, path: Optional[str] = None):
+        """
+            Writes every pattern (the file's and the new ones) to path, defaulting to the one the
+            store was opened from, and carries on reading from the new file.
+            The new file is swapped in over the old one, which this store lets go of first. On Windows
+            a file can't be replaced while it's open, so the swap fails (PermissionError) if any other
+            process still has the old file open, e.g. workers reading from it.
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("The pattern store has no path to save to")
+        records = {key: payload.copy() for key, payload in self._records()} if self._mmap is not None else {}
+        records.update(self._new)
+        keys = sorted(records, key=self._hash)
+
+        # Records go after the header and the index, each one padded out to 8 bytes
+        offset = 16 + 16*len(keys)
+        offsets = []
+        for key in keys:
+            offsets.append(offset)
+            offset += 8 + -(-len(key) // 8) * 8 + 8*len(records[key])
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.MAGIC)
+            f.write(np.array([len(keys)], dtype="<u8").tobytes())
+            f.write(np.array([self._hash(key) for key in keys], dtype="<u8").tobytes())
+            f.write(np.array(offsets, dtype="<u8").tobytes())
+            for key in keys:
+                f.write(np.array([len(key), len(records[key])], dtype="<u4").tobytes())
+                f.write(key + bytes(-len(key) % 8))
+                f.write(np.asarray(records[key], dtype="<u8").tobytes())
+        # Everything from the old file has been written out, so it can be closed before the swap
+        self.close()
+        os.replace(tmp_path, path)
+
+        self.path = path
+        self._new = {}
+        self._open(path)
+
 
 class MineSAT:
-    def __init__(self, board: List[str], num_solver_threads: int = 1):
-        self.board = board
-        self.length = len(board)
-        self.width = len(board[0])
+    def __init__(self, board: Board, num_solver_threads: int = 1, incremental: bool = True,
+                 propagate: bool = True, total_mines: Optional[int] = None,
+                 known: Optional[Dict[Coordinate, bool]] = None,
+                 num_processes: Optional[int] = None, executor: Optional[Executor] = None,
+                 patterns: Optional[PatternStore] = None, backend: str = "cp-sat",
+                 row_reduce: bool = False):
+        # Info maps get copied, the game keeps changing its own in place
+        self.board = board.copy() if isinstance(board, np.ndarray) else board
+        info_map = _info_map(board)
+        self.length, self.width = info_map.shape
         self.threads = num_solver_threads
+        # With more than one process, the backbone probes get split across a process pool. Pass an
+        # executor to reuse one pool across boards, otherwise a pool is started for every analysis.
+        # num_processes should match the executor's size when one is passed, it's one per CPU otherwise.
+        self.num_processes = _pool_size(num_processes, executor)
+        self.executor = executor
+        # With incremental solving the model is built once for this board state and every
+        # probe is just an assumption on top of it, instead of a full rebuild per tile
+        self.incremental = incremental
+        # "cp-sat" builds a model per group and probes it. "counting" never touches OR-Tools: it counts
+        # every solution of each group (see _count_solutions) and reads the forced tiles off the counts,
+        # which is much quicker for the small groups real games are made of. Either gives the same tiles.
+        self.backend = self._check_backend(backend)
+        # Model -> (model, the (mine, safe) literal pairs to probe, and which pair each tile uses)
+        self._models: Dict[int, Tuple[cp_model.CpModel, List[Tuple[cp_model.IntVar, cp_model.IntVar]],
+                                      Dict[Coordinate, int]]] = {}
+        self._solver = None
+        # Most forced tiles fall out of simple counting rules, so unless told otherwise we run those
+        # first and only hand CP-SAT the tiles they couldn't decide. Maps tile -> True if it's a mine.
+        self.propagate = propagate
+        # Row reduction goes further than propagation: it solves the numbers as one system of linear
+        # equations, which finds most of the tiles that take several overlapping numbers to decide
+        self.row_reduce = row_reduce
+        self._known: Optional[Dict[Coordinate, bool]] = None
+        # The (safe, mine, undecided) result of find_all, shared by every query on this board
+        self._analysis: Optional[Tuple[List[Coordinate], List[Coordinate], List[Coordinate]]] = None
+        # Component -> (solutions by mine count, and per tile the solutions where it holds a mine)
+        self._counts: Dict[int, Tuple[MineCounts, Dict[Coordinate, MineCounts]]] = {}
+        # With a pattern store, components it has seen before (or small enough to count outright)
+        # are settled by their counts instead of CP-SAT probes
+        self.patterns = patterns
 
+        # Split the board into revealed numbers and hidden tiles. Everything is kept 1-indexed,
+        # matching the coordinates handed out by try_tile/find_tiles.
+        revealed = info_map <= 8
+        self.numbers: Dict[Coordinate, int] = dict(zip(_tiles(revealed), info_map[revealed].tolist()))
+        self.hidden: List[Coordinate] = _tiles(~revealed)
+        # Hidden tiles that aren't flagged, the only ones we report on
+        self._unflagged = set(_tiles(info_map >= 11))
 
-    def try_tile(self, row: int, col: int, find_safe: bool = True) -> Optional[Coordinate]:
-        # Set up our "board", with space to place borders that will simplify calculations.
-        # e.g. With a 9x9 board, internally we'll represent it as 11x11 with the extra rows always set to 0
+        # The "frontier" is every hidden tile touching a revealed number. Those are the only tiles
+        # that show up in any constraint, so they're the only ones that can ever be forced.
+        # Everything else is the "interior", which no model needs a variable for.
+        padded = np.pad(revealed, 1)
+        touching = np.zeros_like(revealed)
+        for dr in range(3):
+            for dc in range(3):
+                if (dr, dc) != (1, 1):
+                    touching |= padded[dr:dr+self.length, dc:dc+self.width]
+        self.frontier: List[Coordinate] = _tiles(~revealed & touching)
+        self.interior: List[Coordinate] = _tiles(~revealed & ~touching)
+
+        # Tiles already proven safe (False) or mines (True), e.g. by an earlier analysis of this game.
+        # They're taken as given and never probed again.
+        self.facts: Dict[Coordinate, bool] = {t: is_mine for t, is_mine in (known or {}).items()
+                                              if t not in self.numbers}
+
+        # Frontier tiles that never share a number can't influence each other, so each
+        # connected group gets its own (much smaller) model
+        self.components: List[List[Coordinate]] = self._find_components()
+        self._component_of: Dict[Coordinate, int] = {t: i for i, comp in enumerate(self.components)
+                                                     for t in comp}
+
+        # Every component gets its own model. Knowing how many mines are on the board ties the components
+        # and the interior together, so in that case one more model covers all the hidden tiles. It's
+        # only used for what the components can't settle on their own, see find_backbone.
+        self.total_mines = total_mines
+        self._model_groups: List[List[Coordinate]] = list(self.components)
+        self._coupled_group: Optional[int] = None
+        if total_mines is not None and self.hidden:
+            self._coupled_group = len(self._model_groups)
+            self._model_groups.append(self.frontier + self.interior)
+        self._group_of: Dict[Coordinate, int] = {t: i for i, group in enumerate(self._model_groups)
+                                                 for t in group}
+
+
+    def neighbours(self, row: int, col: int) -> Iterator[Coordinate]:
+        """
+            Yields the (1-indexed) tiles adjacent to (row, col) that are actually on the board.
+            Note that "adjacent" in MS includes the diagonals as well as cardinals.
+        """
+        for r in range(max(row-1, 1), min(row+1, self.length)+1):
+            for c in range(max(col-1, 1), min(col+1, self.width)+1):
+                if (r, c) != (row, col):
+                    yield (r, c)
+
+
+    def _find_components(self) -> List[List[Coordinate]]:
+        """
+            Partitions the frontier into groups of tiles linked through shared numbers.
+            Each group comes out in row-major order, and the groups are ordered by their first tile.
+        """
+        components = []
+        seen = set()
+        for start in self.frontier:
+            if start in seen:
+                continue
+            seen.add(start)
+            comp = []
+            queue = [start]
+            while queue:
+                tile = queue.pop()
+                comp.append(tile)
+                for n in self.neighbours(*tile):
+                    if n not in self.numbers:
+                        continue
+                    for t in self.neighbours(*n):
+                        if t not in seen and t not in self.numbers:
+                            seen.add(t)
+                            queue.append(t)
+            components.append(sorted(comp))
+        return components
+
+
+    def _propagate(self) -> Dict[Coordinate, bool]:
+        """
+            Cheap deterministic pass over the numbers, run before any solver is involved:
+              - A number whose remaining mines equal its undecided neighbours makes them all mines.
+              - A number whose mines are all accounted for makes the rest of its neighbours safe.
+              - For two nearby numbers A and B, the tiles only A sees and the tiles only B sees must
+                differ in mine count by exactly rem(A) - rem(B). If that difference equals the size
+                of one side, that side is all mines and the other side is all safe.
+            Starts from the known facts, and returns them along with every tile it could decide,
+            mapped to True (mine) or False (safe).
+        """
+        known: Dict[Coordinate, bool] = dict(self.facts)
+        constraints = {n: [t for t in self.neighbours(*n) if t not in self.numbers] for n in self.numbers}
+        constraints = {n: tiles for n, tiles in constraints.items() if tiles}
+
+        def reduce(n: Coordinate) -> Tuple[set, int]:
+            # Strip a number down to its undecided tiles and the mines still missing among them
+            unknown = {t for t in constraints[n] if t not in known}
+            return unknown, self.numbers[n] - sum(known.get(t, False) for t in constraints[n])
+
+        queue = deque(constraints)
+        queued = set(constraints)
+        while queue:
+            n = queue.popleft()
+            queued.discard(n)
+            unknown, remaining = reduce(n)
+            if not 0 <= remaining <= len(unknown):
+                # The board contradicts itself, so leave every decision to the solver
+                return dict(self.facts)
+            if not unknown:
+                continue
+
+            decided: Dict[Coordinate, bool] = {}
+            if remaining == 0:
+                decided = {t: False for t in unknown}
+            elif remaining == len(unknown):
+                decided = {t: True for t in unknown}
+            else:
+                # Any number sharing a tile with n is at most two rows/columns away
+                for r in range(n[0]-2, n[0]+3):
+                    for c in range(n[1]-2, n[1]+3):
+                        m = (r, c)
+                        if m == n or m not in constraints:
+                            continue
+                        other, other_remaining = reduce(m)
+                        if not unknown & other:
+                            continue
+                        only_n, only_m = unknown - other, other - unknown
+                        if remaining - other_remaining == len(only_n):
+                            decided = {**{t: True for t in only_n}, **{t: False for t in only_m}}
+                        elif other_remaining - remaining == len(only_m):
+                            decided = {**{t: True for t in only_m}, **{t: False for t in only_n}}
+                        if decided:
+                            break
+                    if decided:
+                        break
+
+            for t, is_mine in decided.items():
+                if known.get(t, is_mine) != is_mine:
+                    # The board contradicts itself, so leave every decision to the solver
+                    return dict(self.facts)
+                known[t] = is_mine
+                # Every number around a newly decided tile might now be decidable too
+                for m in self.neighbours(*t):
+                    if m in constraints and m not in queued:
+                        queued.add(m)
+                        queue.append(m)
+        return known
+
+
+    def _reduce_rows(self, known: Dict[Coordinate, bool]) -> Dict[Coordinate, bool]:
+        """
+            Linear-algebra pass: the numbers around each component are the rows of a small integer
+            matrix over its undecided tiles, with the mines they're still missing on the right-hand
+            side. Components never share a number, so the board's matrix is block-diagonal and each
+            block is row reduced on its own. Bound reasoning on the original and reduced rows decides
+            whatever it can.
+            If the mine count is known, one more row adds up every undecided tile, with the interior
+            as a single column counting its mines. It's the only thing tying the blocks together:
+            it gets reduced by the pivot rows of every block, then goes through the same bound reasoning.
+            Decided tiles are substituted in and the whole thing repeats until nothing new comes out.
+            Returns known along with every tile it decided. Like _propagate, it leaves everything to
+            the solver if the board contradicts itself.
+        """
+        # One (tiles, matrix) block per component that still has undecided tiles
+        blocks = []
+        for tiles in self.components:
+            tiles = [t for t in tiles if t not in known]
+            if not tiles:
+                continue
+            column = {t: j for j, t in enumerate(tiles)}
+            numbers = sorted({n for t in tiles for n in self.neighbours(*t) if n in self.numbers})
+            matrix = np.zeros((len(numbers), len(tiles) + 1), dtype=np.int64)
+            for i, n in enumerate(numbers):
+                matrix[i, -1] = self.numbers[n]
+                for t in self.neighbours(*n):
+                    if t in column:
+                        matrix[i, column[t]] = 1
+                    elif known.get(t, False):
+                        matrix[i, -1] -= 1
+            blocks.append((tiles, matrix))
+        interior = [t for t in self.interior if t not in known] if self.total_mines is not None else []
+        if self.total_mines is not None:
+            remaining = self.total_mines - sum(known.get(t, False) for t in self.hidden)
+
+        decided = dict(known)
+        while blocks or interior:
+            forced: Dict[Coordinate, bool] = {}
+            reduced_blocks = []
+            for tiles, matrix in blocks:
+                reduced = _integer_rref(matrix)
+                found = _bound_forced(np.vstack([matrix, reduced]), np.ones(len(tiles), dtype=np.int64))
+                if found is None:
+                    return dict(known)
+                for j in np.flatnonzero(found[0] | found[1]).tolist():
+                    forced[tiles[j]] = bool(found[1][j])
+                reduced_blocks.append(reduced)
+
+            if self.total_mines is not None:
+                width = sum(len(tiles) for tiles, _ in blocks)
+                upper = np.ones(width + bool(interior), dtype=np.int64)
+                if interior:
+                    upper[-1] = len(interior)
+                total = np.ones(len(upper) + 1, dtype=np.int64)
+                total[-1] = remaining
+                original = total.copy()
+                offset = 0
+                for (tiles, _), reduced in zip(blocks, reduced_blocks):
+                    for row in reduced:
+                        pivots = np.flatnonzero(row[:-1])
+                        if not len(pivots) or total[offset + pivots[0]] == 0:
+                            continue
+                        # Same overflow guard as _integer_rref, the row stays valid if it stops here
+                        if np.abs(total).max() > 1 << 31:
+                            break
+                        embedded = np.zeros_like(total)
+                        embedded[offset:offset+len(tiles)] = row[:-1]
+                        embedded[-1] = row[-1]
+                        total = total*row[pivots[0]] - total[offset + pivots[0]]*embedded
+                        total //= max(np.gcd.reduce(total), 1)
+                    offset += len(tiles)
+                found = _bound_forced(np.vstack([original, total]), upper)
+                if found is None:
+                    return dict(known)
+                columns = [[t] for tiles, _ in blocks for t in tiles] + ([interior] if interior else [])
+                for j in np.flatnonzero(found[0] | found[1]).tolist():
+                    for t in columns[j]:
+                        if forced.get(t, found[1][j]) != found[1][j]:
+                            return dict(known)
+                        forced[t] = bool(found[1][j])
+
+            if not forced:
+                break
+            decided.update(forced)
+            # Decided mines move over to the right-hand side, then their columns go
+            for i, (tiles, matrix) in enumerate(blocks):
+                mine = np.array([forced.get(t) is True for t in tiles], dtype=bool)
+                keep = np.array([t not in forced for t in tiles], dtype=bool)
+                matrix[:, -1] -= matrix[:, :-1][:, mine].sum(axis=1)
+                matrix = matrix[:, np.append(keep, True)]
+                blocks[i] = ([t for t in tiles if t not in forced], matrix[(matrix != 0).any(axis=1)])
+            blocks = [(tiles, matrix) for tiles, matrix in blocks if tiles or len(matrix)]
+            if self.total_mines is not None:
+                remaining -= sum(forced.values())
+                interior = [t for t in interior if t not in forced]
+        return decided
+
+
+    def _build_model(self, group: int):
+        tiles = self._model_groups[group]
+        _import_cp_model()
         board = cp_model.CpModel()
-        board_vars = [[board.NewBoolVar(f"Row {r}, Column {c} has a mine")
-                        for c in range(self.width+2)]
-                        for r in range(self.length+2)]
-        # Create the border
-        for c in range(self.width+2):
-            board.Add(board_vars[0][c] == 0)
-            board.Add(board_vars[self.length+1][c] == 0)
-        for r in range(self.length+2):
-            board.Add(board_vars[r][0] == 0)
-            board.Add(board_vars[r][self.width+1] == 0)
-
-        # For each known tile on the board, we'll add constraints that enforce
-        # that the number of mines adjacent equals the value on the tile. 
-        # Note that "adjacent" in MS includes the diagonals as well as cardinals.
-        for r, _row in enumerate(self.board, start=1):
-            for c, tile in enumerate(_row, start=1):
-                if tile in "012345678":
-                    board.Add(board_vars[r][c] == 0)
-                    board.Add(
-                        board_vars[r-1][c-1] + board_vars[r-1][c] + board_vars[r-1][c+1] # Up-left, up, up-right
-                        + board_vars[r][c-1] + board_vars[r][c+1] # Left, right
-                        + board_vars[r+1][c-1] + board_vars[r+1][c] + board_vars[r+1][c+1] == int(tile) # Down-left, down, down-right
-                    )
+        board_vars = {(r, c): board.NewBoolVar(f"Row {r}, Column {c} has a mine")
+                      for r, c in tiles if (r, c) in self._component_of}
+        # A tile can be a mine if its (mine, safe) pair's first literal can hold, and safe if the second can
+        literals = [(tile, tile.Not()) for tile in board_vars.values()]
+        probe_of = {t: i for i, t in enumerate(board_vars)}
+
+        # For each known tile touching this group, we'll add constraints that enforce
+        # that the number of mines adjacent equals the value on the tile.
+        # Every hidden neighbour of such a number is in the same group by definition.
+        constraints = {n for t in board_vars for n in self.neighbours(*t) if n in self.numbers}
+        for r, c in sorted(constraints):
+            board.Add(cp_model.LinearExpr.Sum([board_vars[t] for t in self.neighbours(r, c)
+                                               if t in board_vars]) == self.numbers[(r, c)])
+
+        # Anything the propagation pass already decided is fixed outright
+        known = self._get_known()
+        for t, is_mine in known.items():
+            if t in board_vars:
+                board.Add(board_vars[t] == int(is_mine))
 
+        if group == self._coupled_group:
+            # Interior tiles aren't touched by any number, so rather than a variable each they only
+            # get an aggregate of how many mines they hold between them (minus the ones already known)
+            interior = [t for t in tiles if t not in board_vars and t not in known]
+            known_mines = sum(known.get(t, False) for t in tiles if t not in board_vars)
+            interior_mines = board.NewIntVar(0, len(interior), "Mines in the interior")
+            board.Add(cp_model.LinearExpr.Sum(list(board_vars.values())) + interior_mines
+                      == self.total_mines - known_mines)
+            if interior:
+                # Interior tiles are interchangeable: any of them can be a mine if the interior can hold
+                # one, and any of them can be safe if the interior doesn't have to be full
+                has_mine = board.NewBoolVar("The interior has a mine")
+                board.Add(interior_mines >= 1).OnlyEnforceIf(has_mine)
+                board.Add(interior_mines == 0).OnlyEnforceIf(has_mine.Not())
+                is_full = board.NewBoolVar("The interior is all mines")
+                board.Add(interior_mines == len(interior)).OnlyEnforceIf(is_full)
+                board.Add(interior_mines < len(interior)).OnlyEnforceIf(is_full.Not())
+                literals.append((has_mine, is_full.Not()))
+                probe_of.update({t: len(literals)-1 for t in interior})
+
+        if self._solver is None:
+            self._solver = cp_model.CpSolver()
+            self._solver.parameters.num_search_workers = self.threads
+
+        self._models[group] = (board, literals, probe_of)
+
+
+    def _get_model(self, group: int) -> Tuple[cp_model.CpModel, List[Tuple[cp_model.IntVar, cp_model.IntVar]],
+                                              Dict[Coordinate, int]]:
+        if group not in self._models or not self.incremental:
+            self._build_model(group)
+        return self._models[group]
+
+
+    def _get_known(self) -> Dict[Coordinate, bool]:
+        if self._known is None:
+            self._known = self._propagate() if self.propagate else dict(self.facts)
+            if self.row_reduce:
+                self._known = self._reduce_rows(self._known)
+            if self.patterns is not None:
+                self._apply_patterns()
+        return self._known
+
+
+    def _apply_patterns(self):
+        """
+            Counts the solutions of every component small enough for the pattern store (a lookup if
+            it's been seen before), and adds the tiles that are safe or a mine in all of them to the
+            known tiles. Having been counted, those components are settled without CP-SAT.
+        """
+        for i in range(len(self.components)):
+            if not self._countable(i):
+                continue
+            totals, tile_counts = self._count_solutions(i)
+            if not totals:
+                continue  # Contradiction, left for the solver to report
+            solutions = sum(totals.values())
+            for t, mine_counts in tile_counts.items():
+                if t not in self._known and sum(mine_counts.values()) in (0, solutions):
+                    self._known[t] = sum(mine_counts.values()) == solutions
+
+
+    def _countable(self, component: int) -> bool:
+        known = self._get_known()
+        return sum(t not in known for t in self.components[component]) <= self.patterns.max_tiles
+
+
+    def _pattern_key(self, component: int) -> bytes:
+        """
+            The component's pattern for the pattern store: its tiles (with 0 unknown, 1 safe, 2 mine)
+            and the numbers touching them, moved so the pattern starts at row/column 0.
+        """
+        known = self._get_known()
+        tiles = self.components[component]
+        constraints = sorted({n for t in tiles for n in self.neighbours(*t) if n in self.numbers})
+        top = min(r for r, _ in tiles + constraints)
+        left = min(c for _, c in tiles + constraints)
+        key = [len(tiles), len(constraints)]
+        for r, c in tiles:
+            key += [r-top, c-left, 1 + known[(r, c)] if (r, c) in known else 0]
+        for r, c in constraints:
+            key += [r-top, c-left, self.numbers[(r, c)]]
+        return np.array(key, dtype="<i2").tobytes()
+
+
+    def try_tile(self, row: int, col: int, find_safe: bool = True) -> Optional[Coordinate]:
+        known = self._get_known()
+        if (row, col) in known:
+            return (row, col) if known[(row, col)] != find_safe else None
+
+        # Without a mine count, interior tiles aren't in any constraint, so they can always go either way
+        group = self._group_of.get((row, col))
+        if group is None:
+            return None
+
+        board, literals, probe_of = self._get_model(group)
+
+        # Instead of adding a permanent constraint, the probe is an assumption that gets
+        # swapped out on the next call, so the same model serves every tile in the group
+        mine, safe = literals[probe_of[(row, col)]]
+        board.ClearAssumptions()
         if find_safe:
             # Place the mine
-            board.Add(board_vars[row][col] == 1)
+            board.AddAssumption(mine)
         else:
             # Place the "safe tile" (does that even make sense?)
-            board.Add(board_vars[row][col] == 0)
+            board.AddAssumption(safe)
 
-        solver = cp_model.CpSolver()
-        solver.parameters.num_search_workers = self.threads
         # We only want infeasible solutions, since it means the desired tile 100% cannot be placed in (row, col)
-        if solver.Solve(board) == cp_model.INFEASIBLE:
+        if self._solver.Solve(board) == cp_model.INFEASIBLE:
             return (row, col)
 
 
+    @staticmethod
+    def _check_backend(backend: str) -> str:
+        if backend not in BACKENDS:
+            raise ValueError(f'Backend {backend} is not supported. Available backends: '
+                             + ", ".join(f'"{name}"' for name in BACKENDS))
+        return backend
+
+
+    def find_tiles(self, tile_type: str = "safe", backend: Optional[str] = None) -> List[Coordinate]:
+        if tile_type.lower() not in {"safe", "mine"}:
+            raise ValueError(f'Tile type {tile_type} is not supported. Available types: "safe", "mine"')
+        safe_tiles, mine_tiles, _ = self.find_all(backend)
+        return list(safe_tiles if tile_type.lower()=="safe" else mine_tiles)
+
+
+    def find_all(self, backend: Optional[str] = None) -> Tuple[List[Coordinate], List[Coordinate], List[Coordinate]]:
+        """
+            Returns (safe_tiles, mine_tiles, undecided_tiles) for every hidden tile on the board.
+            The analysis only runs once per MineSAT instance, so asking for safe tiles and then
+            for mines (or calling find_tiles repeatedly) doesn't solve anything twice.
+            backend overrides the one given to the constructor for this call.
+        """
+        if self._analysis is None:
+            safe_tiles, mine_tiles = self.find_backbone(backend)
+            decided = set(safe_tiles) | set(mine_tiles)
+            undecided = [t for t in self.hidden if t in self._unflagged and t not in decided]
+            self._analysis = (safe_tiles, mine_tiles, undecided)
+        return tuple(list(tiles) for tiles in self._analysis)
+
+
+    def find_backbone(self, backend: Optional[str] = None) -> Tuple[List[Coordinate], List[Coordinate]]:
+        """
+            Finds the safe and mine tiles together, returned as (safe_tiles, mine_tiles).
+            With CP-SAT, rather than asking about every tile twice, each model is solved once and
+            only tiles that haven't been seen both ways in some solution get probed. Every probe
+            that succeeds yields another solution, which usually rules out several more tiles.
+            The components are always settled on their own first. A tile that's forced without the
+            mine count is still forced with it, so the model covering the whole board only has to
+            look at what's left, and only when the mine count can make a difference to it.
+        """
+        known = self._get_known()
+        safe_tiles = {t for t, is_mine in known.items() if not is_mine}
+        mine_tiles = {t for t, is_mine in known.items() if is_mine}
+
+        for group_safe, group_mines in self._backbones(list(range(len(self.components))), backend):
+            safe_tiles.update(group_safe)
+            mine_tiles.update(group_mines)
+
+        if self._coupled_group is not None and not safe_tiles & mine_tiles:
+            # The components' tiles become facts for the whole-board model
+            known.update({t: False for t in safe_tiles})
+            known.update({t: True for t in mine_tiles})
+            if self._count_matters():
+                group_safe, group_mines = self._backbones([self._coupled_group], backend)[0]
+                safe_tiles.update(group_safe)
+                mine_tiles.update(group_mines)
+
+        # Only still-hidden tiles are reported, same as find_tiles
+        return sorted(safe_tiles & self._unflagged), sorted(mine_tiles & self._unflagged)
+
+
+    def _backbones(self, groups: List[int], backend: Optional[str] = None) -> List[Tuple[set, set]]:
+        """
+            The backbone of several groups. Groups whose solutions have already been counted (all of
+            them with the counting backend) are read off the counts, the rest go to _group_backbone,
+            fanned out over a process pool if there's more than one process to use.
+            The results come back in the same order as groups either way.
+        """
+        backend = self._check_backend(backend or self.backend)
+        known = self._get_known()
+        results = {group: self._counting_backbone(group) for group in groups
+                   if backend == "counting" or self._is_counted(group)}
+        jobs = [(group, [t for t in self._model_groups[group] if t not in known])
+                for group in groups if group not in results]
+        jobs = [(group, tiles) for group, tiles in jobs if tiles]
+        if self.num_processes <= 1 or not jobs:
+            results.update({group: self._group_backbone(group, tiles) for group, tiles in jobs})
+            return [results.get(group, (set(), set())) for group in groups]
+
+        # Big groups (e.g. the one model covering everything when the mine count is known) are cut into
+        # chunks of tiles, then the chunks are dealt out biggest first to whichever worker has the least
+        chunk = ceil(sum(len(tiles) for _, tiles in jobs) / self.num_processes)
+        jobs = [(group, tiles[i:i+chunk]) for group, tiles in jobs for i in range(0, len(tiles), chunk)]
+        buckets: List[List[Tuple[int, List[Coordinate]]]] = [[] for _ in range(self.num_processes)]
+        for job in sorted(jobs, key=lambda job: (-len(job[1]), job)):
+            min(buckets, key=lambda bucket: sum(len(tiles) for _, tiles in bucket)).append(job)
+        buckets = [bucket for bucket in buckets if bucket]
+
+        # Workers get everything known so far as facts, so they don't redo the propagation pass
+        options = dict(num_solver_threads=self.threads, incremental=self.incremental, propagate=False,
+                       total_mines=self.total_mines, known=known)
+        from concurrent.futures import ProcessPoolExecutor
+        executor = self.executor or ProcessPoolExecutor(max_workers=self.num_processes)
+        try:
+            futures = [executor.submit(_backbone_worker, self.board, options, bucket) for bucket in buckets]
+            results.update({group: (set(), set()) for group in groups if group not in results})
+            for bucket, future in zip(buckets, futures):
+                for (group, _), (group_safe, group_mines) in zip(bucket, future.result()):
+                    results[group][0].update(group_safe)
+                    results[group][1].update(group_mines)
+        finally:
+            if executor is not self.executor:
+                executor.shutdown()
+        return [results[group] for group in groups]
+
+
+    def _count_matters(self) -> bool:
+        """
+            Whether the mine count can decide anything the components couldn't. Whatever mines the
+            undecided frontier tiles hold, the interior has to take the rest. If that always leaves the
+            interior neither empty nor full, every solution of the components fits the count and every
+            interior tile can go either way, so there's nothing for the whole-board model to find.
+        """
+        known = self._get_known()
+        frontier = sum(t not in known for t in self.frontier)
+        interior = sum(t not in known for t in self.interior)
+        remaining = self.total_mines - sum(known.get(t, False) for t in self.hidden)
+        return not frontier < remaining < interior
+
+
+    def _is_counted(self, group: int) -> bool:
+        # A component needs its own counts, the whole-board group needs all of them
+        if group != self._coupled_group:
+            return group in self._counts
+        return all(i in self._counts for i in range(len(self.components)))
+
+
+    def _counting_backbone(self, group: int) -> Tuple[set, set]:
+        """
+            _group_backbone without CP-SAT: every solution of the group is counted, and a tile is
+            forced if it's a mine in none or in all of them.
+        """
+        known = self._get_known()
+        undecided = [t for t in self._model_groups[group] if t not in known]
+        if not undecided:
+            return set(), set()
+        if group != self._coupled_group:
+            totals, tile_counts = self._count_solutions(group)
+            fractions = {t: (sum(counts.values()), sum(totals.values())) for t, counts in tile_counts.items()
+                         if totals}
+        else:
+            fractions = self._mine_fractions(self.total_mines)
+        if not fractions:
+            # Same as CP-SAT finding nothing that fits: everything is "forced"
+            return set(undecided), set(undecided)
+        return ({t for t in undecided if fractions[t][0] == 0},
+                {t for t in undecided if fractions[t][0] == fractions[t][1]})
+
+
+    def _group_backbone(self, group: int, tiles: Optional[List[Coordinate]] = None) -> Tuple[set, set]:
+        """
+            The backbone of a single model, as (safe_tiles, mine_tiles) among the tiles that weren't
+            already known. Hidden tiles of every kind are included, flagged ones too.
+            Passing tiles limits the probing to just those.
+        """
+        known = self._get_known()
+        undecided = [t for t in (self._model_groups[group] if tiles is None else tiles) if t not in known]
+        if not undecided:
+            return set(), set()
+        board, literals, probe_of = self._get_model(group)
+
+        board.ClearAssumptions()
+        if self._solver.Solve(board) == cp_model.INFEASIBLE:
+            # Same as probing each tile one by one: nothing fits, so everything is "forced"
+            return set(undecided), set(undecided)
+
+        # The literal pairs seen holding in any solution found so far. Interior tiles share a
+        # single pair, so they're all settled by the same probes.
+        probes = sorted({probe_of[t] for t in undecided})
+        can_be_mine, can_be_safe = set(), set()
+        def observe():
+            for i in probes:
+                mine, safe = literals[i]
+                if self._solver.BooleanValue(mine):
+                    can_be_mine.add(i)
+                if self._solver.BooleanValue(safe):
+                    can_be_safe.add(i)
+        observe()
+
+        for i in probes:
+            # Try whichever way we haven't seen yet
+            for seen, literal in ((can_be_mine, literals[i][0]), (can_be_safe, literals[i][1])):
+                if i in seen:
+                    continue
+                board.ClearAssumptions()
+                board.AddAssumption(literal)
+                if self._solver.Solve(board) != cp_model.INFEASIBLE:
+                    observe()
+
+        return ({t for t in undecided if probe_of[t] not in can_be_mine},
+                {t for t in undecided if probe_of[t] not in can_be_safe})
+
+
+    def _count_solutions(self, component: int) -> Tuple[MineCounts, Dict[Coordinate, MineCounts]]:
+        """
+            Counts every solution of a component, split by how many mines it uses, along with the
+            same counts restricted to solutions where each tile is a mine.
+            Solutions aren't enumerated one by one: tiles are assigned in an order that closes numbers
+            quickly, and partial assignments that leave the still-open numbers needing the same mines
+            are merged. A forward pass counts the ways to reach each such state and a backward pass
+            counts the ways to finish from it, so a tile's counts are forward x backward across it.
+        """
+        if component in self._counts:
+            return self._counts[component]
+        known = self._get_known()
+        tiles = self.components[component]
+        key = None
+        if self.patterns is not None and self._countable(component):
+            key = self._pattern_key(component)
+            found = self.patterns.get(key)
+            if found is not None:
+                totals, tile_counts = found
+                self._counts[component] = (totals, dict(zip(tiles, tile_counts)))
+                return self._counts[component]
+        constraints = sorted({n for t in tiles for n in self.neighbours(*t) if n in self.numbers})
+        touching = {t: [n for n in self.neighbours(*t) if n in self.numbers] for t in tiles}
+
+        # Greedily pick the tile sitting in the most half-assigned numbers, which keeps the
+        # number of open numbers (and so the number of states) small along chains
+        order = [tiles[0]]
+        remaining = set(tiles[1:])
+        opened = set(touching[tiles[0]])
+        while remaining:
+            t = min(remaining, key=lambda t: (-sum(n in opened for n in touching[t]), t))
+            order.append(t)
+            remaining.discard(t)
+            opened.update(touching[t])
+        position = {t: i for i, t in enumerate(order)}
+        positions = {n: sorted(position[t] for t in self.neighbours(*n) if t in position) for n in constraints}
+        first = {n: p[0] for n, p in positions.items()}
+        last = {n: p[-1] for n, p in positions.items()}
+        # The numbers still waiting on tiles after the first i tiles have been assigned
+        open_at = [tuple(n for n in constraints if first[n] < i <= last[n]) for i in range(len(order)+1)]
+
+        def step(i: int, state: Tuple[int, ...], is_mine: bool) -> Optional[Tuple[int, ...]]:
+            # Assign order[i] and return the mines the open numbers still need, or None if it doesn't fit
+            t = order[i]
+            if known.get(t, is_mine) != is_mine:
+                return None
+            needed = dict(zip(open_at[i], state))
+            for n in touching[t]:
+                needed[n] = needed.get(n, self.numbers[n]) - is_mine
+                if not 0 <= needed[n] <= len(positions[n]) - bisect_right(positions[n], i):
+                    return None
+            return tuple(needed[n] for n in open_at[i+1])
+
+        # forward[i]: state -> the ways to assign the first i tiles and end up in it
+        forward: List[Dict[Tuple[int, ...], MineCounts]] = [{(): {0: 1}}]
+        for i in range(len(order)):
+            layer: Dict[Tuple[int, ...], MineCounts] = {}
+            for state, counts in forward[i].items():
+                for is_mine in (False, True):
+                    nxt = step(i, state, is_mine)
+                    if nxt is None:
+                        continue
+                    target = layer.setdefault(nxt, {})
+                    for k, ways in counts.items():
+                        target[k+is_mine] = target.get(k+is_mine, 0) + ways
+            forward.append(layer)
+
+        # backward[i]: state -> the ways to assign the rest of the tiles starting from it
+        backward: List[Dict[Tuple[int, ...], MineCounts]] = [{} for _ in range(len(order))] + [{(): {0: 1}}]
+        tile_counts: Dict[Coordinate, MineCounts] = {}
+        for i in range(len(order)-1, -1, -1):
+            mine_counts: MineCounts = {}
+            for state, counts in forward[i].items():
+                finish: MineCounts = {}
+                for is_mine in (False, True):
+                    nxt = step(i, state, is_mine)
+                    if nxt is None or nxt not in backward[i+1]:
+                        continue
+                    for k, ways in backward[i+1][nxt].items():
+                        finish[k+is_mine] = finish.get(k+is_mine, 0) + ways
+                    if is_mine:
+                        through = _convolve(counts, {k+1: ways for k, ways in backward[i+1][nxt].items()})
+                        for k, ways in through.items():
+                            mine_counts[k] = mine_counts.get(k, 0) + ways
+                if finish:
+                    backward[i][state] = finish
+            tile_counts[order[i]] = mine_counts
+
+        self._counts[component] = (forward[-1].get((), {}), tile_counts)
+        if key is not None:
+            self.patterns.put(key, self._counts[component][0], [tile_counts[t] for t in tiles])
+        return self._counts[component]
+
+
+    def mine_probabilities(self, total_mines: Optional[int] = None) -> Dict[Coordinate, float]:
+        """
+            Gives the chance of each hidden ("?") tile being a mine, with every consistent board
+            counted as equally likely. total_mines defaults to the one given to the constructor.
+            Without total_mines only frontier tiles get a probability, since nothing says how
+            crowded the interior is. With it, each component's solutions are weighted by the number
+            of ways to fit the leftover mines into the interior, and interior tiles are included.
+            Returns an empty dict if the board can't be solved at all.
+        """
+        if total_mines is None:
+            total_mines = self.total_mines
+        return {t: n / d for t, (n, d) in self._mine_fractions(total_mines).items() if t in self._unflagged}
+
+
+    def _mine_fractions(self, total_mines: Optional[int]) -> Dict[Coordinate, Tuple[int, int]]:
+        """
+            mine_probabilities as exact (solutions with a mine there, solutions) pairs, which is what
+            tells a tile that's never a mine apart from one that's just very unlikely to be.
+        """
+        known = self._get_known()
+        # Known interior tiles are certain either way and come out of the count
+        interior_tiles = [t for t in self.interior if t not in known]
+        probabilities: Dict[Coordinate, Tuple[int, int]] = {t: (int(known[t]), 1) for t in self.interior
+                                                             if t in known}
+        if total_mines is not None:
+            total_mines -= sum(known[t] for t in self.interior if t in known)
+        counts = [self._count_solutions(i) for i in range(len(self.components))]
+        if any(not totals for totals, _ in counts):
+            return {}
+
+        if total_mines is None:
+            for totals, tile_counts in counts:
+                solutions = sum(totals.values())
+                for t, mine_counts in tile_counts.items():
+                    probabilities[t] = (sum(mine_counts.values()), solutions)
+        else:
+            interior = len(interior_tiles)
+
+            # Prefix/suffix products let each component see "everyone else" without redoing them all
+            prefix = [{0: 1}]
+            for totals, _ in counts:
+                prefix.append(_convolve(prefix[-1], totals))
+            suffix = [{0: 1}]
+            for totals, _ in reversed(counts):
+                suffix.append(_convolve(suffix[-1], totals))
+            suffix.reverse()
+
+            everything = prefix[-1]
+            # ways(m): the ways to fit m mines into the interior. The binomials get huge on big boards, so
+            # they're worked out once, and only for the m the frontier can leave over (lowest first, each
+            # from the one before). interior_ways[i] is comb(interior, lowest + i).
+            lowest = max(total_mines - max(everything), 0)
+            highest = min(total_mines - min(everything), interior)
+            interior_ways = [comb(interior, lowest)] if lowest <= highest else []
+            for m in range(lowest, highest):
+                interior_ways.append(interior_ways[-1] * (interior-m) // (m+1))
+            ways = lambda m: interior_ways[m-lowest] if lowest <= m <= highest else 0
+            weight = sum(n * ways(total_mines-k) for k, n in everything.items())
+            if weight == 0:
+                return {}
+            for i, (totals, tile_counts) in enumerate(counts):
+                others = _convolve(prefix[i], suffix[i+1])
+                # The weight of a solution of this component that uses k mines
+                weight_of = {k: sum(n * ways(total_mines-k-j) for j, n in others.items()) for k in totals}
+                for t, mine_counts in tile_counts.items():
+                    probabilities[t] = (sum(n * weight_of[k] for k, n in mine_counts.items()), weight)
+            if interior:
+                # Each interior tile holds its share of whatever mines the frontier leaves over, and
+                # comb(interior, m) * m / interior is the whole number comb(interior-1, m-1)
+                interior_mines = sum(n * ways(total_mines-k) * (total_mines-k) // interior
+                                     for k, n in everything.items() if 0 < total_mines-k <= interior)
+                for t in interior_tiles:
+                    probabilities[t] = (interior_mines, weight)
+
+        return dict(sorted(probabilities.items()))
+
+
+class MineSATSession:
+    """
+        Keeps what the solver has learned across the moves of a single game.
+        Feed it moves as they happen (or whole boards through update) and ask it for tiles the
+        same way as MineSAT. Proven tiles are kept as facts, since the mines never move, and any
+        component whose numbers haven't changed since the last analysis isn't solved again.
+    """
+    def __init__(self, board: Board, total_mines: Optional[int] = None, **solver_options):
+        # Kept as an info map, whichever way the board came in
+        self.board = _info_map(board)
+        self.total_mines = total_mines
+        # Passed through to every MineSAT this session creates, e.g. num_solver_threads
+        self.solver_options = solver_options
+        # Tiles proven safe (False) or mines (True) so far, they hold for the rest of the game
+        self.facts: Dict[Coordinate, bool] = {}
+        # Component (tiles, numbers) -> its (safe, mine) backbone, for the components on the current board
+        self._component_results: Dict[tuple, Tuple[set, set]] = {}
+        self._analysis: Optional[Tuple[List[Coordinate], List[Coordinate], List[Coordinate]]] = None
+        self._solver: Optional[MineSAT] = None
+
+
+    def _set_tile(self, row: int, col: int, value: int):
+        if self.board[row-1, col-1] == value:
+            return
+        self.board[row-1, col-1] = value
+        if value <= 8:
+            # Revealed tiles aren't hidden anymore, so there's nothing left to know about them
+            self.facts.pop((row, col), None)
+        self._analysis = None
+        self._solver = None
+
+
+    def reveal(self, row: int, col: int, value: int):
+        self._set_tile(row, col, value)
+
+
+    def flag(self, row: int, col: int):
+        self._set_tile(row, col, 9)
+
+
+    def unflag(self, row: int, col: int):
+        self._set_tile(row, col, 11)
+
+
+    def update(self, board: Board):
+        """
+            Brings the session up to date with a full board, applying whatever changed as moves.
+        """
+        board = board if isinstance(board, np.ndarray) else _info_map(board)
+        for (r, c), value in zip(_tiles(self.board != board), board[self.board != board].tolist()):
+            self._set_tile(r, c, value)
+
+
+    def _get_solver(self) -> MineSAT:
+        if self._solver is None:
+            self._solver = MineSAT(self.board, total_mines=self.total_mines, known=self.facts,
+                                   **self.solver_options)
+        return self._solver
+
+
     def find_tiles(self, tile_type: str = "safe") -> List[Coordinate]:
         if tile_type.lower() not in {"safe", "mine"}:
             raise ValueError(f'Tile type {tile_type} is not supported. Available types: "safe", "mine"')
-        _find_safe = True if tile_type.lower()=="safe" else False
-
-        found_tiles = []
-        for r in range(self.length):
-            for c in range(self.width):
-                if self.board[r][c] == "?":
-                    t = self.try_tile(r+1, c+1, find_safe=_find_safe)
-                    if t is not None:
-                        found_tiles.append(t)
-        return found_tiles
+        safe_tiles, mine_tiles, _ = self.find_all()
+        return list(safe_tiles if tile_type.lower()=="safe" else mine_tiles)
+
+
+    def find_all(self) -> Tuple[List[Coordinate], List[Coordinate], List[Coordinate]]:
+        """
+            Same as MineSAT.find_all, for the session's current board. The one difference is with
+            total_mines: tiles that only the mine count can settle are looked for on the turns where
+            nothing else is safe, so the cost of a turn stays with what changed instead of the whole board.
+        """
+        if self._analysis is None:
+            # Components are settled on their own first, reusing the results of any that haven't changed
+            local = MineSAT(self.board, known=self.facts, **self.solver_options)
+            signatures = []
+            for tiles in local.components:
+                constraints = sorted({n for t in tiles for n in local.neighbours(*t) if n in local.numbers})
+                signatures.append((tuple(tiles), tuple((n, local.numbers[n]) for n in constraints)))
+            changed = [i for i, signature in enumerate(signatures) if signature not in self._component_results]
+            results = {signature: self._component_results.get(signature) for signature in signatures}
+            for i, result in zip(changed, local._backbones(changed)):
+                results[signatures[i]] = result
+            self._component_results = results
+            self.facts.update(local._get_known())
+            # A component that can't be solved at all has every tile "forced" both ways, like in
+            # MineSAT.find_all. That's reported, but never kept as a fact.
+            contradictions = set()
+            for safe_tiles, mine_tiles in results.values():
+                contradictions |= safe_tiles & mine_tiles
+                self.facts.update({t: False for t in safe_tiles - mine_tiles})
+                self.facts.update({t: True for t in mine_tiles - safe_tiles})
+
+            hidden = _tiles(self.board >= 11)
+            if self.total_mines is not None and not any(self.facts.get(t) is False for t in hidden):
+                # The mine count can only settle what's left over, everything above is given to it as
+                # facts. It's only worth asking when the components left nothing safe to play, and then
+                # the probabilities are wanted too, so the tiles are read off the same exact counts.
+                self._solver = None
+                solver = self._get_solver()
+                fractions = solver._mine_fractions(self.total_mines)
+                if fractions:
+                    self.facts.update(solver._get_known())
+                    self.facts.update({t: n == d for t, (n, d) in fractions.items() if n in (0, d)})
+                else:
+                    # Nothing fits the mine count, the solver reports that the same way as always
+                    self._analysis = solver.find_all()
+            if self._analysis is None:
+                self._analysis = ([t for t in hidden if self.facts.get(t) is False or t in contradictions],
+                                  [t for t in hidden if self.facts.get(t) is True or t in contradictions],
+                                  [t for t in hidden if t not in self.facts and t not in contradictions])
+        return tuple(list(tiles) for tiles in self._analysis)
+
+
+    def mine_probabilities(self) -> Dict[Coordinate, float]:
+        """
+            Same as MineSAT.mine_probabilities, using the session's total_mines.
+        """
+        return self._get_solver().mine_probabilities()
+
+
+def analyse_board(board: Board, total_mines: Optional[int] = None, probabilities: bool = True,
+                  **solver_options) -> BoardAnalysis:
+    """
+        Analyses a single board in one go: its safe, mine and undecided tiles, and the mine
+        probabilities unless those are turned off. Any other keyword arguments go to MineSAT.
+    """
+    solver = MineSAT(board, total_mines=total_mines, **solver_options)
+    safe_tiles, mine_tiles, undecided_tiles = solver.find_all()
+    return BoardAnalysis(safe_tiles, mine_tiles, undecided_tiles,
+                         solver.mine_probabilities() if probabilities else None)
+
+
+def _analyse_worker(boards: List[Board], options: Dict[str, Any], probabilities: bool) -> List[BoardAnalysis]:
+    """
+        Runs in a worker process (or in-process with a single process): analyses a chunk of boards.
+    """
+    return [analyse_board(board, probabilities=probabilities, **options) for board in boards]
+
+
+def analyse_boards(boards: Iterable, total_mines: Optional[int] = None, probabilities: bool = True,
+                   num_processes: Optional[int] = None, chunk_size: int = 16, executor: Optional[Executor] = None,
+                   **solver_options) -> Iterator[BoardAnalysis]:
+    """
+        Analyses many boards, yielding a BoardAnalysis for each one in the order they came in.
+        Boards can be lists of strings or info maps, and are read lazily, so this works on streams.
+        With more than one process (or an executor), boards are handed to the workers in chunks of
+        chunk_size, which keeps the pool and its imports warm across the whole batch instead of
+        paying for them per board. Only a couple of chunks per worker are in flight at a time, where
+        the number of workers is num_processes, or one per CPU for an executor passed without it.
+        Any other keyword arguments go to MineSAT, and total_mines applies to every board.
+    """
+    options = dict(solver_options, total_mines=total_mines)
+    boards = iter(boards)
+    chunks = iter(lambda: list(islice(boards, chunk_size)), [])
+    num_processes = _pool_size(num_processes, executor)
+    if executor is None and num_processes <= 1:
+        for chunk in chunks:
+            yield from _analyse_worker(chunk, options, probabilities)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    pool = executor or ProcessPoolExecutor(max_workers=num_processes)
+    try:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(_analyse_worker, chunk, options, probabilities))
+            if len(in_flight) >= 2*num_processes:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+    finally:
+        if pool is not executor:
+            pool.shutdown(cancel_futures=True)
+
+
+class CanonicalBoard(NamedTuple):
+    """
+        A board turned/mirrored into the orientation PositionCache files it under.
+    """
+    # (shape, bytes) of the canonical info map, the same for all 8 orientations of a board
+    key: tuple
+    info_map: np.ndarray
+    # For each canonical tile, the (0-indexed) row and column it came from on the original board
+    rows: np.ndarray
+    cols: np.ndarray
+
+
+# The 8 rotations/reflections of a grid
+_SYMMETRIES = [lambda a, k=k: np.rot90(a, k) for k in range(4)] + \
+              [lambda a, k=k: np.rot90(a.T, k) for k in range(4)]
+
+
+class PositionCache:
+    """
+        Bounded LRU cache of board analyses in front of MineSAT, for positions that keep coming back.
+        Boards are filed under their canonical form: flagged and questioned tiles count the same (as
+        they do for the solver), and all 8 rotations/reflections of a board share one entry. Results
+        are stored for the canonical orientation and turned back to match whichever board was asked.
+    """
+    def __init__(self, max_size: int = 4096, **solver_options):
+        self.max_size = max_size
+        # Passed to every MineSAT the cache creates
+        self.solver_options = solver_options
+        # (canonical key, total_mines, probabilities) -> analysis of the canonical board, oldest first
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def canonical(board: Board) -> CanonicalBoard:
+        """
+            Picks the orientation of the board with the smallest (shape, bytes), which is the same
+            whichever of the 8 orientations came in.
+        """
+        info_map = _info_map(board)
+        info_map[info_map >= 11] = 11
+        info_map[info_map == 10] = 9
+        index = np.arange(info_map.size).reshape(info_map.shape)
+        best = None
+        for symmetry in _SYMMETRIES:
+            form = symmetry(info_map)
+            key = (form.shape, form.tobytes())
+            if best is None or key < best[0]:
+                best = (key, form, symmetry(index))
+        key, form, index = best
+        rows, cols = np.divmod(index, info_map.shape[1])
+        return CanonicalBoard(key, np.ascontiguousarray(form), rows, cols)
+
+    def get(self, key: tuple) -> Optional[BoardAnalysis]:
+        """
+            The analysis stored under key (in canonical orientation), or None. Counts as a hit or miss.
+        """
+        analysis = self._entries.get(key)
+        if analysis is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return analysis
+
+    def put(self, key: tuple, analysis: BoardAnalysis):
+        self._entries[key] = analysis
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    @staticmethod
+    def to_board(analysis: BoardAnalysis, canonical: CanonicalBoard) -> BoardAnalysis:
+        """
+            Turns an analysis of the canonical board back into the orientation of the original board.
+        """
+        rows, cols = canonical.rows, canonical.cols
+        def tile(t: Coordinate) -> Coordinate:
+            return int(rows[t[0]-1, t[1]-1])+1, int(cols[t[0]-1, t[1]-1])+1
+
+        probabilities = analysis.probabilities
+        if probabilities is not None:
+            probabilities = dict(sorted((tile(t), p) for t, p in probabilities.items()))
+        return BoardAnalysis(sorted(map(tile, analysis.safe_tiles)), sorted(map(tile, analysis.mine_tiles)),
+                             sorted(map(tile, analysis.undecided_tiles)), probabilities)
+
+    def analyse(self, board: Board, total_mines: Optional[int] = None,
+                probabilities: bool = True) -> BoardAnalysis:
+        """
+            Same as analysing the board with MineSAT, but repeated positions (in any orientation)
+            are a dictionary lookup instead of a solve.
+        """
+        canonical = self.canonical(board)
+        key = (canonical.key, total_mines, probabilities)
+        analysis = self.get(key)
+        if analysis is None:
+            analysis = _analyse_worker([canonical.info_map], dict(self.solver_options, total_mines=total_mines),
+                                       probabilities)[0]
+            self.put(key, analysis)
+        return self.to_board(analysis, canonical)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self)}
@@ -0,0 +1,64 @@
+import json
+import socket
+from typing import Dict, List, Optional, Tuple
+
+# Kept to the standard library on purpose: the point of the service is that clients don't import OR-Tools
+Coordinate = Tuple[int, int]
+
+
+class SolverClient:
+    """
+        Client for solver-service.py. Connects once and keeps the connection open, so every request
+        after the first is just a round-trip.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 5679, path: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        if path is not None:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.settimeout(timeout)
+            self.socket.connect(path)
+        else:
+            self.socket = socket.create_connection((host, port), timeout=timeout)
+        self.stream = self.socket.makefile("rwb")
+
+    def close(self):
+        self.stream.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _request(self, request: dict) -> dict:
+        self.stream.write(json.dumps(request).encode("utf-8") + b"\n")
+        self.stream.flush()
+        line = self.stream.readline()
+        if not line:
+            raise ConnectionError("the solver service closed the connection")
+        response = json.loads(line)
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response
+
+    def analyse(self, board, total_mines: Optional[int] = None, probabilities: bool = True) \
+            -> Tuple[List[Coordinate], List[Coordinate], List[Coordinate], Optional[Dict[Coordinate, float]]]:
+        """
+            Analyses a board (a list of strings, or an info map) in the service. Gives back the safe,
+            mine and undecided tiles and the mine probabilities (None if not asked for), in the same
+            order as solver.BoardAnalysis.
+        """
+        if hasattr(board, "tolist"):  # numpy info map
+            board = board.tolist()
+        response = self._request({"board": board, "total_mines": total_mines, "probabilities": probabilities})
+        tiles = [[tuple(tile) for tile in response[kind]] for kind in ("safe", "mine", "undecided")]
+        if response["probabilities"] is not None:
+            response["probabilities"] = {(row, col): p for row, col, p in response["probabilities"]}
+        return tiles[0], tiles[1], tiles[2], response["probabilities"]
+
+    def stats(self) -> Dict[str, int]:
+        """
+            The service's request, cache hit, solve and error counters.
+        """
+        return self._request({"stats": True})
@@ -0,0 +1,76 @@
+from itertools import product
+import numpy as np
+from game.msboard import MSBoard
+from solver import BACKENDS, MineSAT, PatternStore
+
+# Checks the solver against brute force: small random boards are opened up a bit, every way of placing
+# mines on the hidden tiles is tried, and find_all/mine_probabilities have to agree with the ones that fit,
+# for every backend and combination of options
+_SIZES = [(5, 5, 5), (6, 5, 7), (6, 6, 8), (4, 7, 6), (5, 6, 9)]
+_NUM_BOARDS = 60
+_MAX_HIDDEN = 14
+
+
+def random_board(rng: np.random.RandomState) -> MSBoard:
+    width, height, num_mines = _SIZES[rng.randint(len(_SIZES))]
+    # MSBoard places its mines with the global np.random, seed that from rng so every run checks the same boards
+    np.random.seed(rng.randint(2**31))
+    board = MSBoard(width, height, num_mines)
+    safe = list(zip(*np.nonzero(board.mine_map == 0)))
+    for i in rng.choice(len(safe), rng.randint(1, 5), replace=False):
+        board.click_field(safe[i][1], safe[i][0])
+    # Flag a mine now and then, the solver has to treat it as just another hidden tile
+    mines = list(zip(*np.nonzero((board.mine_map == 1) & (board.info_map == 11))))
+    if mines and rng.rand() < 0.3:
+        y, x = mines[rng.randint(len(mines))]
+        board.flag_field(x, y)
+    return board
+
+
+def enumerate_solutions(solver: MineSAT) -> np.ndarray:
+    # Every 0/1 assignment of the hidden tiles (one per row) that fits all the numbers
+    assignments = np.array(list(product((0, 1), repeat=len(solver.hidden))), dtype=np.int64)
+    column = {t: j for j, t in enumerate(solver.hidden)}
+    fits = np.ones(len(assignments), dtype=bool)
+    for n, value in solver.numbers.items():
+        around = [column[t] for t in solver.neighbours(*n) if t in column]
+        fits &= assignments[:, around].sum(axis=1) == value
+    return assignments[fits]
+
+
+rng = np.random.RandomState(0)
+patterns = PatternStore()
+options = [dict(backend=backend, propagate=propagate, row_reduce=row_reduce, patterns=store)
+           for backend, propagate, row_reduce, store in product(BACKENDS, (True, False), (False, True),
+                                                                 (None, patterns))]
+checked = 0
+while checked < _NUM_BOARDS:
+    board = random_board(rng)
+    num_mines = board.num_mines
+    info_map = board.info_map.copy()
+    reference = MineSAT(info_map)
+    if len(reference.hidden) > _MAX_HIDDEN:
+        continue
+    solutions = enumerate_solutions(reference)
+    unflagged = [(j, t) for j, t in enumerate(reference.hidden) if info_map[t[0]-1, t[1]-1] >= 11]
+
+    for total_mines in (None, num_mines):
+        fitting = solutions if total_mines is None else solutions[solutions.sum(axis=1) == total_mines]
+        mines_at = fitting.sum(axis=0)
+        safe = [t for j, t in unflagged if mines_at[j] == 0]
+        mines = [t for j, t in unflagged if mines_at[j] == len(fitting)]
+        undecided = [t for j, t in unflagged if 0 < mines_at[j] < len(fitting)]
+        # Without a mine count only the frontier gets a probability
+        reported = [(j, t) for j, t in unflagged if total_mines is not None or t in reference.frontier]
+        probabilities = {t: mines_at[j] / len(fitting) for j, t in reported}
+
+        for option in options:
+            solver = MineSAT(info_map, total_mines=total_mines, **option)
+            assert solver.find_all() == (safe, mines, undecided), (info_map, total_mines, option)
+            found = solver.mine_probabilities()
+            assert found.keys() == probabilities.keys(), (info_map, total_mines, option)
+            assert all(abs(found[t] - p) < 1e-9 for t, p in probabilities.items()), (info_map, total_mines, option)
+    checked += 1
+
+print(f'{checked} boards match brute force with {len(options)} option sets, with and without the mine count')
+print(f'{len(patterns)} patterns stored along the way')